@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from sqlmodel import Session
 from sqlalchemy import text
 from typing import List, Optional
-from database import get_session
+from database import get_read_session
 
 router = APIRouter(
     prefix="/admin/bookings",
@@ -19,7 +19,7 @@ class BookingOut(BaseModel):
     Total_Amount: float
 
 @router.get("/all", response_model=List[BookingOut])
-def get_all_bookings(session: Session = Depends(get_session)):
+def get_all_bookings(session: Session = Depends(get_read_session)):
     """
     Fetch all bookings (receipts) with details.
     """
@@ -31,7 +31,7 @@ def get_all_bookings(session: Session = Depends(get_session)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/branch/{branch_id}", response_model=List[BookingOut])
-def get_bookings_by_branch(branch_id: int, session: Session = Depends(get_session)):
+def get_bookings_by_branch(branch_id: int, session: Session = Depends(get_read_session)):
     """
     Fetch bookings for a specific branch.
     """
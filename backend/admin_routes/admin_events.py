@@ -4,6 +4,7 @@ from sqlmodel import Session
 from typing import Optional, List
 from sqlalchemy import text
 from database import get_session
+from cache import events_cache
 
 router = APIRouter(
     prefix="/admin/events",
@@ -49,6 +50,7 @@ def create_event_api(
         })
 
         session.commit()
+        events_cache.invalidate()
 
         return {
             "message": "Event created successfully",
@@ -90,6 +92,7 @@ def update_event_api(
             "type": data.type
         })
         session.commit()
+        events_cache.invalidate()
 
         return {"message": "Event updated successfully"}
 
@@ -106,6 +109,7 @@ def delete_event_api(
         proc = text("CALL delete_event(:eid)")
         session.exec(proc, params={"eid": event_id})
         session.commit()
+        events_cache.invalidate()
 
         return {
             "message": "Event deleted successfully",
@@ -4,6 +4,7 @@ from sqlmodel import Session
 from typing import Optional, List
 from sqlalchemy import text
 from database import get_session
+from cache import movies_cache
 
 router = APIRouter(
     prefix="/admin/movies",
@@ -160,6 +161,7 @@ def create_movie(
         # Execute
         session.exec(stmt, params=params)
         session.commit()
+        movies_cache.invalidate()
         
         # Fetch the ID of the newly created movie (optional, but good for response)
         # Since LAST_INSERT_ID() is session-scoped, we might need to fetch it differently or just return success.
@@ -222,6 +224,7 @@ def update_movie(
         }
         session.exec(stmt, params=params)
         session.commit()
+        movies_cache.invalidate()
         
         return {"message": "Movie updated"}
     except Exception as e:
@@ -237,6 +240,7 @@ def delete_movie(
         stmt = text("CALL delete_movie(:p_movie_id)")
         session.exec(stmt, params={"p_movie_id": movie_id})
         session.commit()
+        movies_cache.invalidate()
         return {"message": "Movie deleted successfully"}
     except Exception as e:
         session.rollback()
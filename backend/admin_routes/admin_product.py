@@ -4,6 +4,7 @@ from sqlmodel import Session
 from typing import Optional, List
 from sqlalchemy import text
 from database import get_session
+from cache import products_cache
 
 router = APIRouter(
     prefix="/admin/products",
@@ -67,6 +68,7 @@ def create_food_drink_api(
             "p_type": data.type,
         })
         session.commit()
+        products_cache.invalidate()
 
         return {
             "message": "Food / Drink product created successfully"
@@ -109,6 +111,7 @@ def update_food_drink_api(
             "p_type": data.type,
         })
         session.commit()
+        products_cache.invalidate()
 
         return {
             "message": "Food / Drink product updated successfully",
@@ -132,6 +135,7 @@ def delete_food_drink_api(
             "p_product_id": product_id
         })
         session.commit()
+        products_cache.invalidate()
 
         return {
             "message": "Food / Drink product deleted successfully",
@@ -171,6 +175,7 @@ def create_souvenir_api(
             "p_movie_id": data.movie_id,
         })
         session.commit()
+        products_cache.invalidate()
 
         return {
             "message": "Souvenir product created successfully"
@@ -210,6 +215,7 @@ def update_souvenir_api(
             "p_movie_id": data.movie_id,
         })
         session.commit()
+        products_cache.invalidate()
 
         return {
             "message": "Souvenir product updated successfully",
@@ -237,6 +243,7 @@ def delete_souvenir_api(
             "p_product_id": product_id
         })
         session.commit()
+        products_cache.invalidate()
 
         return {
             "message": "Souvenir product deleted successfully",
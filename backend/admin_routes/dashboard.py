@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
-from database import get_session
+from database import get_read_session
 from sqlalchemy import text
 from datetime import date, timedelta
 
@@ -13,7 +13,7 @@ router = APIRouter(
 def get_primary_dashboard_stats(
     startDate: date = None,
     endDate: date = None,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     if not startDate:
         startDate = date.today().replace(day=1)
@@ -116,7 +116,7 @@ def get_regular_dashboard_stats(
     branch_id: int,
     startDate: date = None,
     endDate: date = None,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     if not startDate:
         startDate = date.today().replace(day=1)
@@ -216,7 +216,7 @@ def get_low_occupancy_alerts(
     branch_id: Optional[int] = None,
     page: int = 1,
     limit: int = 10,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     try:
         offset = (page - 1) * limit
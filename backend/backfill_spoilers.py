@@ -0,0 +1,124 @@
+"""
+Backfill spoiler labels/scores for existing reviews.
+
+Streams Review rows in keyset-paginated chunks ordered by (Movie_id, Customer_id),
+classifies each chunk as one batch and writes Spoiler_label / Spoiler_score back
+with a single UPDATE per chunk. Progress is checkpointed after every chunk, so an
+interrupted run continues where it stopped.
+
+    python backfill_spoilers.py                   # resume from checkpoint if any
+    python backfill_spoilers.py --reset           # start from the beginning
+    python backfill_spoilers.py --flip-tags       # also set spoiler_tag = 'spoiler' when detected
+    python backfill_spoilers.py --chunk-size 500 --batch-size 32 --only-missing
+"""
+import argparse
+import json
+import os
+import time
+from sqlalchemy import text
+from sqlmodel import Session
+
+import model
+from database import engine
+
+CHECKPOINT_PATH = os.getenv("SPOILER_BACKFILL_CHECKPOINT", "spoiler_backfill.json")
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"movie_id": 0, "customer_id": 0, "processed": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def fetch_chunk(session, after_movie_id, after_customer_id, chunk_size, only_missing):
+    query = """
+        SELECT Movie_id, Customer_id, Comment
+        FROM Review
+        WHERE (Movie_id, Customer_id) > (:mid, :cid)
+          AND Comment IS NOT NULL
+    """
+    if only_missing:
+        query += " AND Spoiler_score IS NULL"
+    query += " ORDER BY Movie_id, Customer_id LIMIT :lim"
+    return session.exec(text(query), params={
+        "mid": after_movie_id, "cid": after_customer_id, "lim": chunk_size
+    }).all()
+
+
+def write_chunk(session, rows, results, flip_tags):
+    # One UPDATE ... JOIN over a derived table of all results in the chunk
+    selects = []
+    params = {}
+    for i, (row, result) in enumerate(zip(rows, results)):
+        selects.append(f"SELECT :m{i} AS Movie_id, :c{i} AS Customer_id, :l{i} AS Label, :s{i} AS Score, :n{i} AS Non_spoiler")
+        params.update({
+            f"m{i}": row[0],
+            f"c{i}": row[1],
+            f"l{i}": result["label"],
+            f"s{i}": round(float(result["score"]), 4),
+            f"n{i}": model.is_non_spoiler_result(result),
+        })
+
+    tag_sql = ", r.spoiler_tag = IF(v.Non_spoiler, r.spoiler_tag, 'spoiler')" if flip_tags else ""
+    session.exec(text(f"""
+        UPDATE Review r
+        JOIN ({" UNION ALL ".join(selects)}) v
+          ON r.Movie_id = v.Movie_id AND r.Customer_id = v.Customer_id
+        SET r.Spoiler_label = v.Label,
+            r.Spoiler_score = v.Score{tag_sql}
+    """), params=params)
+    session.commit()
+
+
+def backfill(chunk_size, batch_size, flip_tags, only_missing, checkpoint_path, reset):
+    if reset and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(checkpoint_path)
+
+    classifier = model.get_classifier(wait=True)
+    start = time.perf_counter()
+    processed_this_run = 0
+
+    with Session(engine) as session:
+        while True:
+            rows = fetch_chunk(session, checkpoint["movie_id"], checkpoint["customer_id"], chunk_size, only_missing)
+            if not rows:
+                break
+
+            results = classifier([row[2] for row in rows], batch_size=batch_size)
+            write_chunk(session, rows, results, flip_tags)
+
+            checkpoint["movie_id"], checkpoint["customer_id"] = rows[-1][0], rows[-1][1]
+            checkpoint["processed"] += len(rows)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            processed_this_run += len(rows)
+            elapsed = time.perf_counter() - start
+            print(f"{checkpoint['processed']} rows total, {processed_this_run / elapsed:.1f} rows/s "
+                  f"(last key {checkpoint['movie_id']}/{checkpoint['customer_id']})")
+
+    elapsed = time.perf_counter() - start
+    rate = processed_this_run / elapsed if elapsed else 0.0
+    print(f"Done: {processed_this_run} rows in {elapsed:.1f}s ({rate:.1f} rows/s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill spoiler labels for existing reviews")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows fetched and updated per round trip")
+    parser.add_argument("--batch-size", type=int, default=32, help="texts per model forward pass")
+    parser.add_argument("--flip-tags", action="store_true", help="set spoiler_tag = 'spoiler' for detected spoilers")
+    parser.add_argument("--only-missing", action="store_true", help="skip rows that already have a score")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--reset", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    engine.echo = False
+    backfill(args.chunk_size, args.batch_size, args.flip_tags, args.only_missing, args.checkpoint, args.reset)
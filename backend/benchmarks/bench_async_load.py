@@ -0,0 +1,112 @@
+"""
+Side-by-side load benchmark: sync (pymysql + threadpool) vs async (aiomysql) DB sessions.
+
+Starts a small app with two endpoints running the same events query, one
+on get_session and one on get_async_session, then hits each with
+CONCURRENCY concurrent clients and reports throughput and latency.
+--db-sleep-ms adds SELECT SLEEP() to emulate a slower MySQL round trip.
+
+Needs httpx.  Run from backend/:  python -m benchmarks.bench_async_load [--clients 500]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session
+
+from database import get_async_session, get_session
+
+PORT = 8765
+DB_SLEEP_S = float(os.getenv("BENCH_DB_SLEEP_MS", "0")) / 1000
+QUERY = text("""
+    SELECT Event_id, Title, Type FROM Event ORDER BY Event_id
+""")
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync")
+def sync_endpoint(session: Session = Depends(get_session)):
+    if DB_SLEEP_S:
+        session.exec(text("SELECT SLEEP(:s)"), params={"s": DB_SLEEP_S})
+    return [dict(r) for r in session.exec(QUERY).mappings().all()]
+
+
+@bench_app.get("/async")
+async def async_endpoint(session: AsyncSession = Depends(get_async_session)):
+    if DB_SLEEP_S:
+        await session.execute(text("SELECT SLEEP(:s)"), {"s": DB_SLEEP_S})
+    return [dict(r) for r in (await session.execute(QUERY)).mappings().all()]
+
+
+async def run_load(path, clients, requests_per_client):
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+    return len(latencies) / elapsed, pick(0.5), pick(0.99), errors
+
+
+async def wait_until_up():
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"http://127.0.0.1:{PORT}/docs")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("benchmark server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument("--db-sleep-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    env = dict(os.environ, BENCH_DB_SLEEP_MS=str(args.db_sleep_ms), SQL_LOG_MODE="off")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.bench_async_load:bench_app",
+         "--port", str(PORT), "--log-level", "warning"],
+        env=env
+    )
+    try:
+        asyncio.run(wait_until_up())
+        print(f"{args.clients} clients x {args.requests} requests, db sleep {args.db_sleep_ms} ms")
+        print(f"{'mode':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for mode in ("sync", "async"):
+            rps, p50, p99, errors = asyncio.run(run_load(f"/{mode}", args.clients, args.requests))
+            print(f"{mode:>6} {rps:>9.1f} {p50:>9.1f} {p99:>9.1f} {errors:>7}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark GET /movies/ latency against catalog size.
+
+Seeds N synthetic movies (with reviews and mood votes) and calls query_movies
+(the uncached path of get_movies) for them in the same transaction, which is
+rolled back, so the database is left unchanged even if the run is interrupted.
+
+Run from backend/:  python -m benchmarks.bench_movies
+"""
+import asyncio
+import time
+from sqlalchemy import text, event
+
+from database import async_engine, async_session_factory
+from routes.movies import query_movies
+
+SIZES = [10, 50, 100, 300, 1000]
+REPEAT = 5
+TAG = "bench-catalog"
+
+
+async def seed(session, n):
+    await session.execute(text("""
+        INSERT INTO Movie (Director, Title, Release_date, Language, Age_rating, Duration, Admin_id)
+        VALUES (:director, :title, '2025-01-01', 'English', 'PG-13', 120, 1)
+    """), [{"director": "Bench", "title": f"{TAG}-{i}"} for i in range(n)])
+
+    ids = [r[0] for r in (await session.execute(
+        text("SELECT Movie_id FROM Movie WHERE Title LIKE :t"), {"t": f"{TAG}-%"}
+    )).all()]
+
+    await session.execute(text("""
+        INSERT INTO Review (Movie_id, Customer_id, Rating, Date_comment, Comment)
+        VALUES (:mid, 1, 8.0, CURDATE(), 'bench')
+    """), [{"mid": mid} for mid in ids])
+    await session.execute(text("""
+        INSERT IGNORE INTO Vote (Movie_id, Customer_id, Mood_id) VALUES (:mid, :cid, :mood)
+    """), [
+        {"mid": mid, "cid": cid, "mood": mood}
+        for mid in ids for cid in (1, 2) for mood in (2, 6)
+    ])
+
+
+async def main():
+    statements = [0]
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    print(f"{'movies':>8} {'queries':>8} {'avg ms':>10}")
+    for n in SIZES:
+        async with async_session_factory() as session:
+            try:
+                # Never committed: query_movies reads the rows in the same transaction
+                await seed(session, n)
+                timings = []
+                for _ in range(REPEAT):
+                    statements[0] = 0
+                    start = time.perf_counter()
+                    movies = await query_movies(session, search=TAG)
+                    timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                await session.rollback()
+        assert len(movies) == n
+        print(f"{n:>8} {statements[0]:>8} {sum(timings) / len(timings):>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
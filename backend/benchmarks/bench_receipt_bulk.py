@@ -0,0 +1,101 @@
+"""
+Benchmark receipt creation time against cart size: per-item procedures
+(create_receipt + one create_ticket / create_order_product per extra item,
+the old create_receipt_endpoint path) vs one CALL create_receipt_bulk.
+
+Each run books real AVAILABLE seats of one showtime inside a transaction
+and rolls it back, so the database is left unchanged.
+
+Run from backend/:  python -m benchmarks.bench_receipt_bulk
+"""
+import json
+import time
+from sqlalchemy import text, event
+from sqlmodel import Session
+
+from database import engine
+
+CART_SIZES = [1, 2, 4, 6, 10, 20]
+REPEAT = 5
+CUSTOMER_ID = 1
+
+
+def pick_cart(session, n):
+    """n AVAILABLE seats of the showtime with the most free seats, plus up to n products."""
+    showtime = session.exec(text("""
+        SELECT Showtime_id FROM ShowtimeSeat WHERE Status = 'AVAILABLE'
+        GROUP BY Showtime_id ORDER BY COUNT(*) DESC LIMIT 1
+    """)).first()
+    seats = session.exec(text("""
+        SELECT Movie_id, Showtime_id, Branch_id, Hall_number, Seat_number
+        FROM ShowtimeSeat WHERE Showtime_id = :sid AND Status = 'AVAILABLE'
+        ORDER BY Seat_number LIMIT :n
+    """), params={"sid": showtime[0], "n": n}).all()
+    products = session.exec(text("SELECT Product_id FROM Product ORDER BY Product_id LIMIT :n"), params={"n": n}).all()
+    tickets = [{
+        "price": 100000, "movie_id": s[0], "showtime_id": s[1],
+        "branch_id": s[2], "hall_number": s[3], "seat_number": s[4]
+    } for s in seats]
+    return tickets, [{"product_id": p[0], "quantity": 1} for p in products]
+
+
+def per_item(session, tickets, products):
+    first = tickets[0]
+    first_product = products[0] if products else None
+    receipt_id = session.exec(text("""
+        CALL create_receipt('01/01/2026', 'CARD', 'Paid', :cid, NULL, :pid, :qty,
+                            :price, :mid, :sid, :bid, :hall, :seat)
+    """), params={
+        "cid": CUSTOMER_ID,
+        "pid": first_product["product_id"] if first_product else None,
+        "qty": first_product["quantity"] if first_product else None,
+        "price": first["price"], "mid": first["movie_id"], "sid": first["showtime_id"],
+        "bid": first["branch_id"], "hall": first["hall_number"], "seat": first["seat_number"],
+    }).first()[0]
+    for t in tickets[1:]:
+        session.exec(text("CALL create_ticket(:price, :rid, :mid, :sid, :bid, :hall, :seat)"), params={
+            "price": t["price"], "rid": receipt_id, "mid": t["movie_id"], "sid": t["showtime_id"],
+            "bid": t["branch_id"], "hall": t["hall_number"], "seat": t["seat_number"],
+        })
+    for p in products[1:]:
+        session.exec(text("CALL create_order_product(:rid, :pid, :qty)"),
+                     params={"rid": receipt_id, "pid": p["product_id"], "qty": p["quantity"]})
+
+
+def bulk(session, tickets, products):
+    session.exec(text("""
+        CALL create_receipt_bulk('01/01/2026', 'CARD', 'Paid', :cid, NULL, :tickets, :products)
+    """), params={"cid": CUSTOMER_ID, "tickets": json.dumps(tickets), "products": json.dumps(products)}).first()
+
+
+def measure(fn, n, statements):
+    timings = []
+    for _ in range(REPEAT):
+        with Session(engine) as session:
+            tickets, products = pick_cart(session, n)
+            session.commit()
+            statements[0] = 0
+            start = time.perf_counter()
+            fn(session, tickets, products)
+            session.flush()
+            timings.append((time.perf_counter() - start) * 1000)
+            session.rollback()
+    return statements[0], sum(timings) / len(timings), len(tickets) + len(products)
+
+
+def main():
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    print(f"{'items':>6} {'per-item stmts':>15} {'per-item ms':>12} {'bulk stmts':>11} {'bulk ms':>9}")
+    for n in CART_SIZES:
+        item_stmts, item_ms, items = measure(per_item, n, statements)
+        bulk_stmts, bulk_ms, _ = measure(bulk, n, statements)
+        print(f"{items:>6} {item_stmts:>15} {item_ms:>12.2f} {bulk_stmts:>11} {bulk_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
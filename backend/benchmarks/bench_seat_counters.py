@@ -0,0 +1,183 @@
+"""
+Booking throughput with 50 concurrent bookers per hall: per-showtime sharded
+counters (ShowtimeSeatCounter) vs the old Hall hot row.
+
+Each booker owns its own AVAILABLE seats (no seat-level conflicts) and books
+them in carts of --cart seats (random 1..N), the way book_cart does: lock the
+cart's seats FOR UPDATE in key order, CALL create_receipt_bulk with the seats
+in cart order, --work-ms of simulated work while the locks are held, COMMIT.
+Only the counter rows are shared, so any deadlock reported here comes from
+the counters.
+
+  spread  bookers spread over every showtime of the busiest hall
+  single  all bookers on one showtime of that hall
+
+--legacy-hall-row also runs the old trg_seat_book statement
+(UPDATE Hall SET Seat_capacity = Seat_capacity - n) in every booking, so
+every booking in the hall serialises on the Hall row again. Seat_capacity has
+CHECK (Seat_capacity > 0), so both variants book at most capacity - 1 seats.
+Receipts are released at the end (and Hall restored); loyalty points of the
+test customers are not reverted.
+
+Run against a test database, from backend/:
+    python -m benchmarks.bench_seat_counters [--bookers 50] [--per-booker 10] [--cart 4] [--work-ms 5]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from sqlalchemy import bindparam, exc, text
+from sqlmodel import Session
+
+from database import engine, lock_conflict_reason
+from routes.receipt import release_receipt
+
+
+def busiest_hall(session):
+    return session.exec(text("""
+        SELECT ss.Branch_id, ss.Hall_number, h.Seat_capacity
+        FROM ShowtimeSeat ss
+        JOIN Hall h ON h.Branch_id = ss.Branch_id AND h.Hall_number = ss.Hall_number
+        WHERE ss.Status = 'AVAILABLE'
+        GROUP BY ss.Branch_id, ss.Hall_number, h.Seat_capacity
+        ORDER BY COUNT(DISTINCT ss.Showtime_id) DESC, COUNT(*) DESC LIMIT 1
+    """)).first()
+
+
+def assign_seats(session, hall, mode, bookers, per_booker):
+    """One list of seats per booker, round-robin over the showtimes of the hall."""
+    showtimes = [row[0] for row in session.exec(text("""
+        SELECT Showtime_id FROM ShowtimeSeat
+        WHERE Branch_id = :bid AND Hall_number = :hall AND Status = 'AVAILABLE'
+        GROUP BY Showtime_id ORDER BY COUNT(*) DESC
+    """), params={"bid": hall[0], "hall": hall[1]}).all()]
+    if mode == "single":
+        showtimes = showtimes[:1]
+    seats = {sid: session.exec(text("""
+        SELECT Movie_id, Showtime_id, Branch_id, Hall_number, Seat_number FROM ShowtimeSeat
+        WHERE Showtime_id = :sid AND Branch_id = :bid AND Hall_number = :hall AND Status = 'AVAILABLE'
+        ORDER BY Seat_number
+    """), params={"sid": sid, "bid": hall[0], "hall": hall[1]}).all() for sid in showtimes}
+
+    # the legacy Hall decrement must stay above the CHECK (Seat_capacity > 0)
+    total = min(bookers * per_booker, hall[2] - 1)
+    lists = [[] for _ in range(bookers)]
+    for i in range(total):
+        free = seats[showtimes[i % len(showtimes)]]
+        if not free:
+            break
+        lists[i % bookers].append(free.pop())
+    return showtimes, lists
+
+
+def carts(seats, max_cart):
+    """Split a booker's seats into carts of one showtime, 1..max_cart seats each, shuffled."""
+    by_showtime = {}
+    for seat in seats:
+        by_showtime.setdefault(seat[1], []).append(seat)
+    result = []
+    for group in by_showtime.values():
+        while group:
+            n = random.randint(1, max_cart)
+            cart, group = group[:n], group[n:]
+            random.shuffle(cart)
+            result.append(cart)
+    random.shuffle(result)
+    return result
+
+
+def book(session, hall, cart, customer_id, work_ms, legacy):
+    keys = sorted((s[1], s[2], s[3], s[4]) for s in cart)
+    session.exec(text("""
+        SELECT Seat_number FROM ShowtimeSeat
+        WHERE (Showtime_id, Branch_id, Hall_number, Seat_number) IN :keys
+        ORDER BY Showtime_id, Branch_id, Hall_number, Seat_number
+        FOR UPDATE
+    """).bindparams(bindparam("keys", expanding=True)), params={"keys": keys}).all()
+    receipt_id = session.exec(text("""
+        CALL create_receipt_bulk(:date, 'CARD', 'Paid', :cid, NULL, :tickets, '[]')
+    """), params={"date": time.strftime("%d/%m/%Y"), "cid": customer_id, "tickets": json.dumps([{
+        "price": 100000, "movie_id": s[0], "showtime_id": s[1],
+        "branch_id": s[2], "hall_number": s[3], "seat_number": s[4],
+    } for s in cart])}).first()[0]
+    if legacy:
+        session.exec(text("""
+            UPDATE Hall SET Seat_capacity = Seat_capacity - :n
+            WHERE Branch_id = :bid AND Hall_number = :hall
+        """), params={"n": len(cart), "bid": hall[0], "hall": hall[1]})
+    time.sleep(work_ms / 1000)
+    session.commit()
+    return receipt_id
+
+
+def booker(hall, seats, customer_id, args, legacy, results, lock):
+    with Session(engine) as session:
+        for cart in carts(seats, args.cart):
+            try:
+                receipt_id = book(session, hall, cart, customer_id, args.work_ms, legacy)
+            except exc.DBAPIError as e:
+                session.rollback()
+                with lock:
+                    results["errors"][lock_conflict_reason(e) or type(e.orig).__name__] += 1
+                continue
+            with lock:
+                results["receipts"].append(receipt_id)
+                results["seats"] += len(cart)
+
+
+def revert(hall, results, legacy):
+    with Session(engine) as session:
+        for receipt_id in results["receipts"]:
+            release_receipt(session, receipt_id)
+        if legacy:
+            session.exec(text("""
+                UPDATE Hall SET Seat_capacity = Seat_capacity + :n
+                WHERE Branch_id = :bid AND Hall_number = :hall
+            """), params={"n": results["seats"], "bid": hall[0], "hall": hall[1]})
+        session.commit()
+
+
+def run(mode, legacy, args):
+    with Session(engine) as session:
+        hall = busiest_hall(session)
+        showtimes, lists = assign_seats(session, hall, mode, args.bookers, args.per_booker)
+        customers = [row[0] for row in session.exec(text("SELECT Customer_id FROM Customer ORDER BY Customer_id")).all()]
+
+    results, lock = {"receipts": [], "seats": 0, "errors": Counter()}, threading.Lock()
+    threads = [threading.Thread(target=booker, args=(hall, seats, customers[i % len(customers)], args, legacy, results, lock))
+               for i, seats in enumerate(lists) if seats]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    revert(hall, results, legacy)
+    return len(showtimes), len(threads), results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seat booking throughput: sharded counters vs Hall row")
+    parser.add_argument("--bookers", type=int, default=50)
+    parser.add_argument("--per-booker", type=int, default=10, help="seats per booker (capped at hall capacity - 1 in total)")
+    parser.add_argument("--cart", type=int, default=4, help="max seats per booking")
+    parser.add_argument("--work-ms", type=float, default=5, help="time spent inside each booking transaction")
+    parser.add_argument("--legacy-hall-row", action="store_true", help="only run the old Hall-row variant")
+    args = parser.parse_args()
+
+    variants = [True] if args.legacy_hall_row else [False, True]
+    print(f"{'mode':>7} {'counter':>10} {'showtimes':>10} {'bookers':>8} {'bookings':>9} {'seats':>6} "
+          f"{'s':>7} {'bookings/s':>11}  errors")
+    for mode in ("spread", "single"):
+        for legacy in variants:
+            showtimes, bookers, results, elapsed = run(mode, legacy, args)
+            booked = len(results["receipts"])
+            errors = ", ".join(f"{n} {reason}" for reason, n in results["errors"].most_common()) or "-"
+            print(f"{mode:>7} {'hall row' if legacy else 'sharded':>10} {showtimes:>10} {bookers:>8} "
+                  f"{booked:>9} {results['seats']:>6} {elapsed:>7.2f} {booked / elapsed:>11.1f}  {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare spoiler-model backends (torch fp32, int8, onnx) on a fixed labelled sample.
+
+For each backend, in a fresh interpreter: load time, resident memory,
+single-comment latency, batched latency and the is_non_spoiler decision
+(THRESHOLD) for every sample. Decisions are checked against the torch
+backend (parity) and against the sample labels (accuracy).
+
+Run from backend/:  python -m benchmarks.bench_spoiler_backends [--backends torch int8 onnx] [--min-parity 1.0]
+Exits with status 1 if a backend's parity with torch is below --min-parity.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "spoiler_sample.json")
+
+WORKER = r"""
+import json, resource, sys, time
+import model
+
+backend, sample_path = sys.argv[1], sys.argv[2]
+with open(sample_path, encoding="utf-8") as f:
+    texts = [s["text"] for s in json.load(f)]
+
+start = time.perf_counter()
+classifier = model._build_classifier(backend)
+load_s = time.perf_counter() - start
+
+classifier(texts[0])  # warm-up
+start = time.perf_counter()
+results = [classifier(t)[0] for t in texts]
+single_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+start = time.perf_counter()
+classifier(texts, batch_size=len(texts))
+batch_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+print(json.dumps({
+    "load_s": load_s,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "single_ms": single_ms,
+    "batch_ms": batch_ms,
+    "decisions": [model.is_non_spoiler_result(r) for r in results],
+}))
+"""
+
+
+def run_backend(backend):
+    proc = subprocess.run(
+        [sys.executable, "-c", WORKER, backend, SAMPLE_PATH],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--min-parity", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        expected = [not s["spoiler"] for s in json.load(f)]
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results = {b: run_backend(b) for b in backends}
+    reference = results["torch"].get("decisions")
+
+    print(f"{'backend':>8} {'load s':>8} {'rss MB':>8} {'1x ms':>8} {'batch ms':>9} {'accuracy':>9} {'parity':>7}")
+    failed = False
+    for backend, r in results.items():
+        if "error" in r:
+            print(f"{backend:>8}  error: {r['error']}")
+            failed = failed or backend in args.backends
+            continue
+        decisions = r["decisions"]
+        accuracy = sum(d == e for d, e in zip(decisions, expected)) / len(expected)
+        parity = sum(d == e for d, e in zip(decisions, reference)) / len(reference) if reference else 0.0
+        failed = failed or parity < args.min_parity
+        print(f"{backend:>8} {r['load_s']:>8.1f} {r['rss_mb']:>8.0f} {r['single_ms']:>8.1f} "
+              f"{r['batch_ms']:>9.1f} {accuracy:>9.0%} {parity:>7.0%}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Benchmark cold boot of an API worker, before and after lazy model loading.
+
+  eager:  import main + load the spoiler model before serving (old behaviour)
+  lazy:   import main only; the model warms in the background afterwards
+
+Each case runs in a fresh interpreter so nothing is shared between runs.
+Run from backend/:  python -m benchmarks.bench_startup
+"""
+import subprocess
+import sys
+import time
+
+REPEAT = 3
+
+CASES = {
+    "eager": "import main, model; model.load_model()",
+    "lazy": "import main",
+}
+
+
+def cold_boot(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'mode':>6} {'best s':>8} {'avg s':>8}")
+    for name, code in CASES.items():
+        timings = [cold_boot(code) for _ in range(REPEAT)]
+        print(f"{name:>6} {min(timings):>8.2f} {sum(timings) / len(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
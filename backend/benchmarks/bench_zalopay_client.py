@@ -0,0 +1,115 @@
+"""
+ZaloPay client load benchmark against the local stub (zalopay_stub.py):
+a new urlopen connection per call (the old routes/zalopay.py) vs the pooled
+ZaloPayClient from worker threads vs AsyncZaloPayClient with asyncio.gather.
+
+Starts the stub itself on STUB_PORT; --latency-ms / --error-rate are passed to
+it (with errors, only the clients' retried status queries recover).
+
+Needs httpx.  Run from backend/:
+    python -m benchmarks.bench_zalopay_client [--clients 50] [--calls 20] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+STUB_PORT = 8091
+os.environ["ZALOPAY_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+
+from routes.zalopay import (  # noqa: E402  (reads ZALOPAY_BASE_URL on import)
+    AsyncZaloPayClient, ZaloPayClient, build_order, build_query, config,
+)
+
+
+def urlopen_query(app_trans_id):
+    # routes/zalopay.py before the pooled client: new connection, no timeout
+    try:
+        response = urllib.request.urlopen(url=config["query_endpoint"],
+                                          data=urllib.parse.urlencode(build_query(app_trans_id)).encode())
+        return json.loads(response.read())
+    except Exception as e:
+        return {"returncode": -1, "returnmessage": str(e)}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result.get("returncode") == 1
+
+
+async def timed_async(fn, *args):
+    start = time.perf_counter()
+    result = await fn(*args)
+    return (time.perf_counter() - start) * 1000, result.get("returncode") == 1
+
+
+def run_threads(fn, ids, clients):
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        return list(pool.map(lambda i: timed(fn, i), ids))
+
+
+async def run_async(client, ids, clients):
+    limit = asyncio.Semaphore(clients)
+
+    async def one(i):
+        async with limit:
+            return await timed_async(client.query_order, i)
+
+    try:
+        return await asyncio.gather(*(one(i) for i in ids))
+    finally:
+        await client.close()
+
+
+def report(name, results, elapsed):
+    latencies = sorted(ms for ms, _ in results)
+    ok = sum(1 for _, success in results if success)
+    print(f"{name:>10} {len(results) / elapsed:>9.1f} {latencies[len(latencies) // 2]:>8.1f} "
+          f"{latencies[int(len(latencies) * 0.99) - 1]:>8.1f} {ok:>6}/{len(results)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZaloPay client: urlopen vs pooled sync vs async")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=20, help="status queries per client")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    stub = subprocess.Popen([sys.executable, "zalopay_stub.py", "--port", str(STUB_PORT),
+                             "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate)])
+    try:
+        time.sleep(1)
+        # one order per client, queried over and over
+        seed = ZaloPayClient()
+        orders = [build_order(100000, [], 900000 + i) for i in range(args.clients)]
+        for order in orders:
+            seed.create_order(order)
+        seed.close()
+        ids = [order["apptransid"] for order in orders] * args.calls
+
+        print(f"{'client':>10} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'ok':>13}")
+        start = time.perf_counter()
+        report("urlopen", run_threads(urlopen_query, ids, args.clients), time.perf_counter() - start)
+
+        client = ZaloPayClient()
+        start = time.perf_counter()
+        report("pooled", run_threads(client.query_order, ids, args.clients), time.perf_counter() - start)
+        client.close()
+
+        start = time.perf_counter()
+        results = asyncio.run(run_async(AsyncZaloPayClient(), ids, args.clients))
+        report("async", results, time.perf_counter() - start)
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
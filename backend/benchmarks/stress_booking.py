@@ -0,0 +1,164 @@
+"""
+Concurrency stress test for seat booking (book_cart + retry_on_lock_conflict).
+
+CLIENTS threads repeatedly try to book 1-4 random seats out of a small pool
+of the same showtime, with the seats listed in random order, so carts overlap
+heavily. Afterwards it checks that:
+  - no seat got more than one ticket,
+  - every seat of a successful booking is BOOKED,
+  - every failure is a clean 409 (seat taken / held), not a 400 or 500,
+  - no hold is left behind, failed bookings included.
+Receipts created in a round are released before the next one (loyalty
+points of the test customers are not reverted).
+
+Run against a test database, from backend/:
+    python -m benchmarks.stress_booking [--clients 50] [--rounds 5] [--pool 20]
+Set SEAT_HOLD_BACKEND=mysql to exercise the shared hold table as well.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from fastapi import HTTPException
+from sqlalchemy import bindparam, text
+from sqlmodel import Session
+
+import metrics
+from database import LOCK_CONFLICT_CODES, engine
+from routes.receipt import CreateReceiptRequest, TicketItem, place_booking, release_receipt
+from seat_holds import hold_store
+
+
+def pick_pool(pool_size):
+    with Session(engine) as session:
+        showtime = session.exec(text("""
+            SELECT Showtime_id FROM ShowtimeSeat WHERE Status = 'AVAILABLE'
+            GROUP BY Showtime_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)).first()
+        seats = session.exec(text("""
+            SELECT Movie_id, Showtime_id, Branch_id, Hall_number, Seat_number
+            FROM ShowtimeSeat WHERE Showtime_id = :sid AND Status = 'AVAILABLE'
+            ORDER BY Seat_number LIMIT :n
+        """), params={"sid": showtime[0], "n": pool_size}).all()
+        customers = [row[0] for row in session.exec(text("SELECT Customer_id FROM Customer ORDER BY Customer_id")).all()]
+    return seats, customers
+
+
+def attempt(seats, customer_id, outcomes, receipts, lock):
+    cart = random.sample(seats, random.randint(1, min(4, len(seats))))
+    data = CreateReceiptRequest(
+        receipt_date=time.strftime("%d/%m/%Y"), method="CARD", customer_id=customer_id,
+        tickets=[TicketItem(movie_id=s[0], showtime_id=s[1], branch_id=s[2], hall_number=s[3],
+                            seat_number=s[4], price=100000) for s in cart],
+    )
+
+    with Session(engine) as session:
+        try:
+            # the endpoint's path, holds included
+            receipt_id = place_booking(session, data)
+            with lock:
+                outcomes["booked"] += 1
+                receipts[receipt_id] = cart
+        except HTTPException as e:
+            message = e.detail.get("message") if isinstance(e.detail, dict) else e.detail
+            with lock:
+                outcomes[f"{e.status_code} {message}"] += 1
+        except Exception as e:
+            with lock:
+                outcomes[f"error {type(e).__name__}: {str(e)[:80]}"] += 1
+
+
+def leftover_holds(showtime_id):
+    if hold_store.stats()["backend"] == "memory":
+        return hold_store.stats()["holds"]
+    with Session(engine) as session:
+        return session.exec(text("""
+            SELECT COUNT(*) FROM SeatHold WHERE Showtime_id = :sid AND Expires_at > NOW()
+        """), params={"sid": showtime_id}).first()[0]
+
+
+def verify(receipts, showtime_id):
+    problems = []
+    holds = leftover_holds(showtime_id)
+    if holds:
+        problems.append(f"{holds} seat holds left after the round")
+    if not receipts:
+        return problems
+    with Session(engine) as session:
+        duplicates = session.exec(text("""
+            SELECT Showtime_id, Seat_number, COUNT(*) FROM Ticket
+            WHERE Receipt_id IN :rids
+            GROUP BY Showtime_id, Branch_id, Hall_number, Seat_number
+            HAVING COUNT(*) > 1
+        """).bindparams(bindparam("rids", expanding=True)), params={"rids": list(receipts)}).all()
+        problems += [f"seat {d[1]} of showtime {d[0]} has {d[2]} tickets" for d in duplicates]
+
+        not_booked = session.exec(text("""
+            SELECT t.Seat_number, ss.Status FROM Ticket t
+            JOIN ShowtimeSeat ss
+              ON ss.Showtime_id = t.Showtime_id AND ss.Branch_id = t.Branch_id
+             AND ss.Hall_number = t.Hall_number AND ss.Seat_number = t.Seat_number
+            WHERE t.Receipt_id IN :rids AND ss.Status <> 'BOOKED'
+        """).bindparams(bindparam("rids", expanding=True)), params={"rids": list(receipts)}).all()
+        problems += [f"seat {n[0]} is {n[1]} but has a ticket" for n in not_booked]
+    return problems
+
+
+def lock_retries():
+    return sum(metrics.REGISTRY.get_sample_value("db_lock_retries_total", {"reason": reason}) or 0
+               for reason in LOCK_CONFLICT_CODES.values())
+
+
+def cleanup(receipts):
+    with Session(engine) as session:
+        for receipt_id in receipts:
+            release_receipt(session, receipt_id)
+        session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent seat booking stress test")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pool", type=int, default=20, help="seats the clients compete for")
+    args = parser.parse_args()
+
+    seats, customers = pick_pool(args.pool)
+    outcomes, lock = Counter(), threading.Lock()
+    problems = []
+    elapsed = 0.0
+    for _ in range(args.rounds):
+        receipts = {}
+        threads = [
+            threading.Thread(target=attempt, args=(
+                seats, customers[i % len(customers)], outcomes, receipts, lock))
+            for i in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed += time.perf_counter() - start
+        try:
+            problems += verify(receipts, seats[0][1])
+        finally:
+            # free the pool again for the next round
+            cleanup(receipts)
+
+    total = args.clients * args.rounds
+    print(f"{total} bookings in {elapsed:.2f}s ({total / elapsed:.1f}/s), "
+          f"{lock_retries():.0f} deadlock/lock-wait retries")
+    for outcome, n in outcomes.most_common():
+        print(f"  {n:>5}  {outcome}")
+    unexpected = [o for o in outcomes if o != "booked" and not o.startswith("409")]
+    for p in problems:
+        print(f"  FAIL  {p}")
+    if problems or unexpected:
+        raise SystemExit(1)
+    print("OK: no double booking, all failures are 409")
+
+
+if __name__ == "__main__":
+    main()
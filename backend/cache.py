@@ -0,0 +1,197 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+import metrics
+from database import engine, async_engine, async_session_factory
+
+load_dotenv()
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))        # giây
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "256"))       # số key tối đa / cache
+CATALOG_CACHE_VERSION_CHECK_INTERVAL = float(os.getenv("CATALOG_CACHE_VERSION_CHECK_INTERVAL", "1"))  # giây
+
+
+class CatalogCache:
+    """
+    In-memory LRU cache with TTL for read models (movies, events, products).
+
+    Each cache has a version that is bumped by invalidate(). A value loaded
+    while an invalidation happened is not stored, so a write endpoint never
+    leaves an older read in the cache after it commits. For one TTL after an
+    invalidation, get_or_load_async loads from the primary instead of the
+    caller's (possibly lagging replica) session.
+
+    The entries live in one worker process, the invalidations are shared:
+    invalidate() also bumps the cache's row in CacheVersion, and every worker
+    compares that version (one primary-key read on the primary) at most every
+    CATALOG_CACHE_VERSION_CHECK_INTERVAL seconds before serving, dropping its
+    entries when it moved. A write shows up in every worker within that interval.
+    """
+
+    def __init__(self, name: str, ttl: float = CATALOG_CACHE_TTL, maxsize: int = CATALOG_CACHE_SIZE,
+                 check_interval: float = CATALOG_CACHE_VERSION_CHECK_INTERVAL):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        self.version = 0
+        self.shared_version = None   # last CacheVersion.Version seen by this worker
+        self.checked_at = 0.0
+        self.version_checks = 0
+        self.remote_invalidations = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.invalidated_at = None
+        self.primary_loads = 0
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                metrics.CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return True, entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            metrics.CACHE_REQUESTS.labels(self.name, "miss").inc()
+            return False, None
+
+    def set(self, key, value, version: int = None):
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    _VERSION_QUERY = text("SELECT Version FROM CacheVersion WHERE Cache_name = :name")
+
+    def _check_due(self) -> bool:
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return False
+        self.checked_at = now        # concurrent requests skip the check meanwhile
+        self.version_checks += 1
+        return True
+
+    def _seen(self, row):
+        version = row[0] if row else 0
+        if self.shared_version is not None and version != self.shared_version:
+            # Invalidated (by any worker) since the last check
+            self.remote_invalidations += 1
+            self._clear()
+        self.shared_version = version
+
+    def check_shared_version(self):
+        if not self._check_due():
+            return
+        try:
+            with engine.connect() as conn:
+                self._seen(conn.execute(self._VERSION_QUERY, {"name": self.name}).first())
+        except Exception as e:
+            print(f"[Cache] Version check of {self.name} failed: {e}")
+
+    async def check_shared_version_async(self):
+        if not self._check_due():
+            return
+        try:
+            async with async_engine.connect() as conn:
+                self._seen((await conn.execute(self._VERSION_QUERY, {"name": self.name})).first())
+        except Exception as e:
+            print(f"[Cache] Version check of {self.name} failed: {e}")
+
+    def get_or_load(self, key, loader):
+        self.check_shared_version()
+        hit, value = self.get(key)
+        if hit:
+            return value
+        version = self.version
+        value = loader()
+        self.set(key, value, version)
+        return value
+
+    def _recently_invalidated(self) -> bool:
+        # A replica lagging less than one TTL has the write by the time this is False
+        return self.invalidated_at is not None and time.monotonic() - self.invalidated_at < self.ttl
+
+    async def get_or_load_async(self, key, loader, session):
+        """
+        Same as get_or_load for an async loader taking a session: loader(session),
+        or loader(primary session) right after an invalidation, so a replica
+        that has not seen the write yet cannot refill the cache for a whole TTL.
+        """
+        await self.check_shared_version_async()
+        hit, value = self.get(key)
+        if hit:
+            return value
+        version = self.version
+        if self._recently_invalidated() and session.bind is not async_engine:
+            self.primary_loads += 1
+            async with async_session_factory() as primary:
+                value = await loader(primary)
+        else:
+            value = await loader(session)
+        self.set(key, value, version)
+        return value
+
+    def _clear(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self.invalidated_at = time.monotonic()
+            self._data.clear()
+        metrics.CACHE_INVALIDATIONS.labels(self.name).inc()
+
+    def invalidate(self):
+        """Drop the entries of this worker now, and of the other workers at their next version check."""
+        self._clear()
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO CacheVersion (Cache_name, Version) VALUES (:name, 1)
+                    ON DUPLICATE KEY UPDATE Version = Version + 1
+                """), {"name": self.name})
+        except Exception as e:
+            # The write is committed already; the other workers catch up within one TTL
+            print(f"[Cache] Could not publish invalidation of {self.name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self.version,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "primary_loads": self.primary_loads,
+                "shared_version": self.shared_version,
+                "version_checks": self.version_checks,
+                "remote_invalidations": self.remote_invalidations,
+            }
+
+
+movies_cache = CatalogCache("movies")
+events_cache = CatalogCache("events")
+products_cache = CatalogCache("products")
+
+CACHES = {c.name: c for c in (movies_cache, events_cache, products_cache)}
+
+
+def cache_stats():
+    return {name: c.stats() for name, c in CACHES.items()}
@@ -1,6 +1,19 @@
 from sqlmodel import create_engine, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import exc, text
 from dotenv import load_dotenv
+from fastapi import Request
+from typing import List
+import itertools
 import os
+import random
+import threading
+import time
+
+from sql_logging import install_sql_logging
+from query_stats import install_query_counter
+import metrics
 
 load_dotenv()
 DB_USER = os.getenv("DB_USER")
@@ -9,20 +22,279 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
+# Connection pool (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))        # giây chờ lấy connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))        # < wait_timeout của MySQL
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"                         # echo thô của SQLAlchemy, chỉ dùng khi debug
+
+# Read replicas: comma-separated mysql+pymysql:// URLs (optional)
+DB_REPLICA_URLS = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+
+# Deadlock / lock wait timeout retries for booking transactions
+DB_LOCK_RETRIES = int(os.getenv("DB_LOCK_RETRIES", "3"))
+DB_LOCK_RETRY_BASE_MS = float(os.getenv("DB_LOCK_RETRY_BASE_MS", "20"))
+LOCK_CONFLICT_CODES = {1213: "deadlock", 1205: "lock_wait_timeout"}
+
 DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+
+
+class PoolTelemetry:
+    """Counters for connection checkout (sync and async pools): wait time, overflow use and timeouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+
+    def record(self, wait_ms: float, overflow: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+
+pool_telemetry = PoolTelemetry()
+
+
+class TimedPoolMixin:
+    """Records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_telemetry.record_timeout()
+            metrics.DB_POOL_TIMEOUTS.inc()
+            raise
+        wait = time.perf_counter() - start
+        pool_telemetry.record(wait * 1000, self.overflow() > 0)
+        metrics.DB_POOL_WAIT.observe(wait)
+        return conn
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def make_engine(url: str):
+    engine = create_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    install_sql_logging(engine)
+    install_query_counter(engine)
+    return engine
+
+
+def make_async_engine(url: str):
+    engine = create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    install_sql_logging(engine.sync_engine)
+    install_query_counter(engine.sync_engine)
+    return engine
+
+
+engine = make_engine(DATABASE_URL)
+
+# Async engine (aiomysql) for the hot read routers: requests wait on MySQL
+# without holding a threadpool thread.
+async_engine = make_async_engine(ASYNC_DATABASE_URL)
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class ReplicaSet:
+    """
+    Read replicas from DB_REPLICA_URLS, picked round-robin among the healthy ones.
+    A background thread pings each replica every DB_REPLICA_CHECK_INTERVAL seconds;
+    when none is healthy, reads go to the primary.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = []
+        for url in urls:
+            self.replicas.append({
+                "url": url.split("@")[-1],          # không log user/password
+                "engine": make_engine(url),
+                "async_engine": make_async_engine(url.replace("mysql+pymysql://", "mysql+aiomysql://", 1)),
+                "healthy": True,
+                "last_error": None,
+            })
+        self._next = itertools.count()
+        self._thread = None
+
+    def pick(self):
+        healthy = [r for r in self.replicas if r["healthy"]]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def mark_unhealthy(self, replica, error):
+        replica["healthy"] = False
+        replica["last_error"] = str(error)
+
+    def check(self):
+        for replica in self.replicas:
+            try:
+                with replica["engine"].connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                replica["healthy"] = True
+                replica["last_error"] = None
+            except Exception as e:
+                self.mark_unhealthy(replica, e)
+
+    def start_health_checks(self, interval: float = DB_REPLICA_CHECK_INTERVAL):
+        if not self.replicas or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        def _run():
+            while True:
+                self.check()
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=_run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        return [{"url": r["url"], "healthy": r["healthy"], "last_error": r["last_error"]} for r in self.replicas]
+
+
+replica_set = ReplicaSet(DB_REPLICA_URLS)
+
+
+def use_primary(request: Request) -> bool:
+    # Read-your-writes opt-out: a client that just wrote can ask for the primary
+    return request.headers.get("X-Read-Primary") == "1"
 
-engine = create_engine(DATABASE_URL, echo=True)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
-if __name__ == "__main__":
-    from sqlalchemy import text
 
+async def get_async_session():
+    async with async_session_factory() as session:
+        yield session
+
+
+def get_read_session(request: Request):
+    """Session for read-only endpoints: a healthy replica if configured, otherwise the primary."""
+    replica = None if use_primary(request) else replica_set.pick()
+    if replica is not None:
+        session = Session(replica["engine"])
+        try:
+            session.connection()     # pre-ping now so a dead replica falls back to the primary
+        except exc.DBAPIError as e:
+            session.close()
+            replica_set.mark_unhealthy(replica, e)
+        else:
+            with session:
+                yield session
+            return
+    with Session(engine) as session:
+        yield session
+
+
+async def get_async_read_session(request: Request):
+    """Async variant of get_read_session."""
+    replica = None if use_primary(request) else replica_set.pick()
+    if replica is not None:
+        session = AsyncSession(replica["async_engine"], expire_on_commit=False)
+        try:
+            await session.connection()
+        except exc.DBAPIError as e:
+            await session.close()
+            replica_set.mark_unhealthy(replica, e)
+        else:
+            async with session:
+                yield session
+            return
+    async with async_session_factory() as session:
+        yield session
+
+
+def lock_conflict_reason(error: exc.DBAPIError):
+    """'deadlock' / 'lock_wait_timeout' when MySQL aborted the statement on a lock conflict, else None."""
+    args = getattr(error.orig, "args", ())
+    return LOCK_CONFLICT_CODES.get(args[0]) if args else None
+
+
+def retry_on_lock_conflict(session: Session, fn, retries: int = DB_LOCK_RETRIES):
+    """
+    Run fn() (one whole transaction, committed inside) and retry it after a
+    rollback when MySQL reports a deadlock or lock wait timeout, sleeping a
+    jittered exponential backoff so the competing transactions spread out.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except exc.DBAPIError as e:
+            reason = lock_conflict_reason(e)
+            session.rollback()
+            if reason is None or attempt == retries:
+                raise
+            metrics.DB_LOCK_RETRIES.labels(reason).inc()
+            time.sleep(random.uniform(0, DB_LOCK_RETRY_BASE_MS * (2 ** attempt)) / 1000)
+
+
+def get_pool_stats():
+    pool = engine.pool
+    async_pool = async_engine.pool
+    with pool_telemetry._lock:
+        checkouts = pool_telemetry.checkouts
+        return {
+            "pid": os.getpid(),
+            "pool_size": pool.size(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "async_checked_out": async_pool.checkedout(),
+            "async_overflow": max(async_pool.overflow(), 0),
+            "replicas": replica_set.stats(),
+            "checkouts": checkouts,
+            "avg_wait_ms": pool_telemetry.total_wait_ms / checkouts if checkouts else 0.0,
+            "max_wait_ms": pool_telemetry.max_wait_ms,
+            "overflow_checkouts": pool_telemetry.overflow_checkouts,
+            "timeouts": pool_telemetry.timeouts,
+        }
+
+if __name__ == "__main__":
     try:
         with Session(engine) as session:
-            session.exec(text("SELECT 1")) 
+            session.exec(text("SELECT 1"))
             print("Kết nối MySQL thành công!")
     except Exception as e:
-        print("Kết nối thất bại:", e)
\ No newline at end of file
+        print("Kết nối thất bại:", e)
@@ -1,5 +1,8 @@
 # backend/main.py
+import os
+import time
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes.movies import router as movies_router
@@ -16,9 +19,21 @@ from admin_routes.admin_bookings import router as admin_bookings_router
 from routes.authentication import router as authentication_router
 from admin_regular_routes.admin_regular_movies import router as admin_regular_movies_router
 from admin_regular_routes.admin_regular_showtime import router as admin_regular_showtimes_router
-from routes.receipt import router as receipt_router
+from routes.receipt import router as receipt_router, start_pending_payment_sweeper
 from admin_routes.dashboard import router as dashboard_router
 from routes.votemood import router as votemood_router
+from routes.seat_holds import router as seat_holds_router
+from cache import cache_stats
+from seat_map import seat_map_cache
+from seat_holds import start_hold_sweeper
+from seat_events import seat_hub
+import model as spoiler_model
+from database import engine, get_pool_stats, replica_set
+from sql_logging import current_request
+import query_stats
+import metrics
+from review_moderation import MODERATION_MODE, moderation_worker
+from routes.zalopay import zalopay_client, async_zalopay_client
 
 app = FastAPI()
 origins = [
@@ -35,6 +50,34 @@ app.add_middleware(
     allow_methods=["*"],       # VERY IMPORTANT
     allow_headers=["*"],
 )
+
+
+@app.middleware("http")
+async def track_request_scope(request, call_next):
+    # Lets engine event listeners know which route issued a statement
+    token = current_request.set(request.scope)
+    stats = query_stats.QueryStats()
+    stats_token = query_stats.current_stats.set(stats)
+    in_flight = metrics.REQUESTS_IN_FLIGHT.labels(request.method)
+    in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        # Query count / DB time of this request, N+1 warnings
+        query_stats.report(stats, response.headers)
+        return response
+    finally:
+        # Route template (not the raw path) keeps label cardinality bounded
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status)
+        ).observe(time.perf_counter() - start)
+        in_flight.dec()
+        query_stats.current_stats.reset(stats_token)
+        current_request.reset(token)
+
 # router cho customer
 app.include_router(movies_router)
 app.include_router(event_router)
@@ -45,6 +88,7 @@ app.include_router(voucher)
 app.include_router(membership)
 app.include_router(receipt_router)
 app.include_router(votemood_router)
+app.include_router(seat_holds_router)
 
 
 # router cho admin
@@ -58,3 +102,86 @@ app.include_router(admin_regular_movies_router)
 app.include_router(admin_bookings_router)
 app.include_router(admin_regular_showtimes_router)
 app.include_router(dashboard_router)
+
+
+@app.get("/cache/stats", tags=["monitoring"])
+def get_cache_stats():
+    """Hit/miss counters of the in-process catalog and seat-map caches (per worker)."""
+    return {**cache_stats(), "seat_map": seat_map_cache.stats(), "seat_streams": seat_hub.stats()}
+
+
+@app.get("/db/pool", tags=["monitoring"])
+def get_db_pool_stats():
+    """Connection pool usage of this worker process (checked out, wait time, overflow)."""
+    return get_pool_stats()
+
+
+@app.get("/metrics", tags=["monitoring"], include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics, aggregated over all workers when PROMETHEUS_MULTIPROC_DIR is set."""
+    metrics.update_pool_gauges(get_pool_stats())
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.on_event("startup")
+def warm_spoiler_model():
+    spoiler_model.result_cache.load()
+    # Load the spoiler classifier in the background so the worker can serve right away
+    # (in remote mode the model server holds it, unless we fall back to a local copy)
+    if spoiler_model.MODEL_MODE == "remote" and spoiler_model.REMOTE_FALLBACK != "local":
+        return
+    if os.getenv("SPOILER_MODEL_PRELOAD", "1") == "1":
+        spoiler_model.start_background_load()
+
+
+@app.on_event("startup")
+def start_replica_health_checks():
+    replica_set.start_health_checks()
+
+
+@app.on_event("startup")
+def start_pool_metrics():
+    metrics.start_pool_gauge_updates(get_pool_stats)
+
+
+@app.on_event("startup")
+def start_pending_payment_expiry():
+    start_pending_payment_sweeper()
+
+
+@app.on_event("startup")
+def start_seat_hold_expiry():
+    start_hold_sweeper(engine)
+
+
+@app.on_event("startup")
+def start_review_moderation():
+    if MODERATION_MODE == "async":
+        moderation_worker.start(engine)
+
+
+@app.on_event("shutdown")
+def save_spoiler_cache():
+    spoiler_model.result_cache.save()
+
+
+@app.on_event("shutdown")
+def release_worker_metrics():
+    metrics.mark_worker_dead()
+
+
+@app.on_event("shutdown")
+async def close_zalopay_clients():
+    zalopay_client.close()
+    await async_zalopay_client.close()
+
+
+@app.get("/health/ready", tags=["monitoring"])
+def readiness():
+    """Readiness of this worker: 200 once the spoiler model is loaded, 503 while warming."""
+    status = spoiler_model.get_model_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content={
+        "spoiler_model": status,
+        "review_moderation": moderation_worker.stats(),
+    })
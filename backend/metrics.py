@@ -0,0 +1,120 @@
+"""
+Prometheus metrics, exposed at GET /metrics.
+
+With several uvicorn/gunicorn workers, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory shared by the workers *before* they start (it is read when
+prometheus_client is imported). Each worker then writes its samples there
+and /metrics aggregates all of them, whichever worker serves the scrape.
+Clear the directory on every deploy.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest,
+)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+POOL_GAUGE_INTERVAL = float(os.getenv("METRICS_POOL_INTERVAL", "5"))    # giây giữa 2 lần cập nhật pool gauges
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template and status code",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being served", ["method"], multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections checked out of the pool", ["pool"], multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Overflow connections in use", ["pool"], multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Checkouts that hit DB_POOL_TIMEOUT")
+DB_LOCK_RETRIES = Counter("db_lock_retries_total", "Transactions retried after a deadlock / lock wait timeout", ["reason"])
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+CACHE_INVALIDATIONS = Counter("cache_invalidations_total", "Cache invalidations", ["cache"])
+
+SPOILER_INFERENCE = Histogram(
+    "spoiler_inference_seconds", "Spoiler model call latency (one batch locally, one request remotely)",
+    ["mode"], buckets=LATENCY_BUCKETS,
+)
+SPOILER_BATCH_SIZE = Histogram(
+    "spoiler_batch_size", "Texts per local inference batch", buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+EXTERNAL_CALL = Histogram(
+    "external_call_duration_seconds", "Latency of calls to external services (ZaloPay, SMTP)",
+    ["service", "operation", "outcome"], buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def time_external(service: str, operation: str):
+    """Time a call to an external service; outcome is 'error' if the block raises."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        EXTERNAL_CALL.labels(service, operation, outcome).observe(time.perf_counter() - start)
+
+
+def update_pool_gauges(pool_stats: dict):
+    DB_POOL_CHECKED_OUT.labels("sync").set(pool_stats["checked_out"])
+    DB_POOL_OVERFLOW.labels("sync").set(pool_stats["overflow"])
+    DB_POOL_CHECKED_OUT.labels("async").set(pool_stats["async_checked_out"])
+    DB_POOL_OVERFLOW.labels("async").set(pool_stats["async_overflow"])
+
+
+_pool_gauge_thread = None
+
+def start_pool_gauge_updates(get_pool_stats, interval: float = POOL_GAUGE_INTERVAL):
+    """
+    Refresh the pool gauges of this worker every `interval` seconds, off the
+    request path (a scrape served by another worker still sees them).
+    """
+    global _pool_gauge_thread
+    if _pool_gauge_thread is not None and _pool_gauge_thread.is_alive():
+        return
+
+    def _run():
+        while True:
+            try:
+                update_pool_gauges(get_pool_stats())
+            except Exception as e:
+                print(f"[Metrics] Pool gauge update failed: {e}")
+            time.sleep(interval)
+
+    _pool_gauge_thread = threading.Thread(target=_run, name="pool-gauges", daemon=True)
+    _pool_gauge_thread.start()
+
+
+def render():
+    """(body, content type) of the metrics of all workers."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead():
+    # Drop this worker's live gauges from the aggregate when it exits
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
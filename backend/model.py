@@ -1,25 +1,471 @@
-from transformers import pipeline
+import hashlib
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import metrics
 
 THRESHOLD = 0.95
+MODEL_NAME = "bhavyagiri/roberta-base-finetuned-imdb-spoilers"
 
-print("Loading spoiler detection model...")
+# torch: fp32 PyTorch (default) | int8: dynamic int8 quantization of the Linear layers
+# onnx: ONNX Runtime via optimum (pip install optimum[onnxruntime])
+MODEL_BACKEND = os.getenv("SPOILER_MODEL_BACKEND", "torch")
 
-spoiler_classifier = pipeline(
-    "text-classification",
-    model="bhavyagiri/roberta-base-finetuned-imdb-spoilers",
-    tokenizer="bhavyagiri/roberta-base-finetuned-imdb-spoilers",
-    truncation=True
-)
+# Micro-batching: concurrent requests are collected for up to BATCH_WAIT_MS
+# and classified together as one padded batch of at most BATCH_SIZE texts.
+BATCH_SIZE = int(os.getenv("SPOILER_BATCH_SIZE", "16"))
+BATCH_WAIT_MS = float(os.getenv("SPOILER_BATCH_WAIT_MS", "5"))
 
-print("Spoiler model loaded ✅")
+# Result cache keyed on the normalised comment text, persisted between restarts.
+RESULT_CACHE_SIZE = int(os.getenv("SPOILER_CACHE_SIZE", "10000"))
+RESULT_CACHE_PATH = os.getenv("SPOILER_CACHE_PATH", "spoiler_cache.json")
 
-def is_non_spoiler_comment(text_comment: str) -> bool:
-    result = spoiler_classifier(text_comment)[0]
+# local: each worker holds its own copy of the model.
+# remote: classify through model_server.py, which holds one copy for all workers.
+MODEL_MODE = os.getenv("SPOILER_MODEL_MODE", "local")
+SERVER_ADDR = os.getenv("SPOILER_SERVER_ADDR", "unix:/tmp/spoiler_model.sock")   # or tcp:127.0.0.1:8765
+SERVER_TIMEOUT = float(os.getenv("SPOILER_SERVER_TIMEOUT", "5"))
+SERVER_RETRY_SECONDS = float(os.getenv("SPOILER_SERVER_RETRY_SECONDS", "5"))
+REMOTE_FALLBACK = os.getenv("SPOILER_REMOTE_FALLBACK", "none")                   # none | local
+
+# After a failed load, the next request retries it in the background after
+# LOAD_RETRY_SECONDS, doubling per consecutive failure up to LOAD_RETRY_MAX_SECONDS.
+LOAD_RETRY_SECONDS = float(os.getenv("SPOILER_LOAD_RETRY_SECONDS", "30"))
+LOAD_RETRY_MAX_SECONDS = float(os.getenv("SPOILER_LOAD_RETRY_MAX_SECONDS", "600"))
+
+# Model is loaded lazily (first use) or warmed in a background thread after startup,
+# so importing this module never blocks a worker.
+_classifier = None
+_state = "not_loaded"          # not_loaded | loading | ready | failed
+_error = None
+_load_seconds = None
+_failures = 0
+_failed_at = 0.0
+_loader = None
+_lock = threading.Lock()
+_loader_lock = threading.Lock()       # not _lock: that one is held for the whole load
+
+
+class ModelNotReady(Exception):
+    """Raised when the spoiler model is still loading (or failed to load)."""
+
+
+def _build_classifier(backend: str = None):
+    from transformers import pipeline, AutoTokenizer
+
+    backend = backend or MODEL_BACKEND
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    if backend == "torch":
+        model = MODEL_NAME
+    elif backend == "int8":
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        model = torch.quantization.quantize_dynamic(
+            AutoModelForSequenceClassification.from_pretrained(MODEL_NAME),
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+    elif backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            raise RuntimeError("SPOILER_MODEL_BACKEND=onnx requires: pip install optimum[onnxruntime]")
+        model = ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True)
+    else:
+        raise ValueError(f"Unknown SPOILER_MODEL_BACKEND: {backend}")
+
+    return pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=tokenizer,
+        truncation=True
+    )
+
+
+def load_model():
+    """Load the spoiler classifier (blocking). Safe to call from several threads."""
+    global _classifier, _state, _error, _load_seconds, _failures, _failed_at
+
+    with _lock:
+        if _state == "ready":
+            return _classifier
+        _state = "loading"
+        _error = None
+        print("Loading spoiler detection model...")
+        start = time.perf_counter()
+        try:
+            _classifier = _build_classifier()
+        except Exception as e:
+            _state = "failed"
+            _error = str(e)
+            _failures += 1
+            _failed_at = time.monotonic()
+            print(f"Spoiler model failed to load (retry in {_retry_delay():.0f}s): {e}")
+            raise
+        _load_seconds = time.perf_counter() - start
+        _failures = 0
+        _state = "ready"
+        print(f"Spoiler model loaded ✅ ({_load_seconds:.1f}s)")
+        return _classifier
+
+
+def _retry_delay() -> float:
+    return min(LOAD_RETRY_SECONDS * 2 ** max(_failures - 1, 0), LOAD_RETRY_MAX_SECONDS)
+
+
+def _retry_due() -> bool:
+    return _state == "failed" and time.monotonic() - _failed_at >= _retry_delay()
+
+
+def start_background_load():
+    """Warm the model in a daemon thread; returns immediately."""
+    global _loader
+    if _state in ("ready", "loading"):
+        return
+
+    def _run():
+        try:
+            load_model()
+        except Exception:
+            pass
+
+    with _loader_lock:
+        if _loader is not None and _loader.is_alive():
+            return
+        _loader = threading.Thread(target=_run, name="spoiler-model-loader", daemon=True)
+        _loader.start()
+
+
+def get_model_status():
+    if MODEL_MODE == "remote":
+        server = server_client.health()
+        return {
+            "model": MODEL_NAME,
+            "mode": "remote",
+            "server": SERVER_ADDR,
+            "state": server.get("state"),
+            "ready": bool(server.get("ready")) or (REMOTE_FALLBACK == "local" and _state == "ready"),
+            "fallback": REMOTE_FALLBACK,
+            "server_status": server,
+            "result_cache": result_cache.stats(),
+        }
+    return {
+        "model": MODEL_NAME,
+        "mode": "local",
+        "backend": MODEL_BACKEND,
+        "state": _state,
+        "ready": _state == "ready",
+        "load_seconds": _load_seconds,
+        "error": _error,
+        "failures": _failures,
+        "retry_in": max(0.0, _failed_at + _retry_delay() - time.monotonic()) if _state == "failed" else None,
+        "inference": inference_queue.stats(),
+        "result_cache": result_cache.stats(),
+    }
+
+
+def get_classifier(wait: bool = False):
+    """
+    Return the loaded pipeline.
+    wait=False: raise ModelNotReady while the model is warming up.
+    wait=True: load it in the calling thread if needed.
+    """
+    if _state == "ready":
+        return _classifier
+    if wait:
+        return load_model()
+    if _state == "not_loaded" or _retry_due():
+        start_background_load()
+    raise ModelNotReady(f"Spoiler model is {_state}")
+
+
+class InferenceQueue:
+    """
+    Collects classification requests from request threads and runs them
+    through the pipeline in batches on a single worker thread.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, max_wait_ms: float = BATCH_WAIT_MS):
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+        self.total_batch_ms = 0.0
+        self.max_batch_ms = 0.0
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="spoiler-inference", daemon=True)
+                self._thread.start()
+
+    def submit(self, text_comment: str) -> Future:
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((text_comment, future))
+        return future
+
+    def classify(self, text_comment: str) -> dict:
+        return self.submit(text_comment).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text_comment for text_comment, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = get_classifier()(texts, batch_size=len(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            metrics.SPOILER_INFERENCE.labels("local").observe(elapsed_ms / 1000)
+            metrics.SPOILER_BATCH_SIZE.observe(len(batch))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.last_batch_size = len(batch)
+                self.last_batch_ms = elapsed_ms
+                self.total_batch_ms += elapsed_ms
+                self.max_batch_ms = max(self.max_batch_ms, elapsed_ms)
 
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "batch_size": self.batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "last_batch_size": self.last_batch_size,
+                "last_batch_ms": self.last_batch_ms,
+                "avg_batch_ms": self.total_batch_ms / self.batches if self.batches else 0.0,
+                "max_batch_ms": self.max_batch_ms,
+            }
+
+
+inference_queue = InferenceQueue()
+
+
+class SpoilerResultCache:
+    """
+    Bounded LRU of classification results keyed on a hash of the comment
+    with whitespace collapsed and case folded, so resubmitting the same
+    text skips the model.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, path: str = RESULT_CACHE_PATH):
+        self.maxsize = maxsize
+        self.path = path
+        self._data = OrderedDict()   # key -> {"label", "score", "ms"}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    @staticmethod
+    def key(text_comment: str) -> str:
+        normalised = " ".join((text_comment or "").split()).casefold()
+        return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+    def get(self, text_comment: str):
+        key = self.key(text_comment)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                metrics.CACHE_REQUESTS.labels("spoiler", "miss").inc()
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            metrics.CACHE_REQUESTS.labels("spoiler", "hit").inc()
+            self.saved_ms += entry["ms"]
+            return {"label": entry["label"], "score": entry["score"]}
+
+    def put(self, text_comment: str, result: dict, ms: float):
+        key = self.key(text_comment)
+        with self._lock:
+            self._data[key] = {"label": result["label"], "score": result["score"], "ms": ms}
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Spoiler cache not loaded: {e}")
+            return
+        with self._lock:
+            for key, entry in entries[-self.maxsize:]:
+                self._data[key] = entry
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = list(self._data.items())
+        # One temp file per process: workers shutting down together must not
+        # write into the same file; the last os.replace wins with a whole file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "saved_inference_ms": self.saved_ms,
+            }
+
+
+result_cache = SpoilerResultCache()
+
+
+def parse_server_addr(addr: str = SERVER_ADDR):
+    """'unix:/path.sock' -> (AF_UNIX, path); 'tcp:host:port' -> (AF_INET, (host, port))."""
+    kind, _, rest = addr.partition(":")
+    if kind == "unix":
+        return socket.AF_UNIX, rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return socket.AF_INET, (host, int(port))
+    raise ValueError(f"Invalid SPOILER_SERVER_ADDR: {addr}")
+
+
+class ModelServerClient:
+    """
+    Talks to model_server.py with one JSON line per request/response.
+    After a failure the server is considered down for SERVER_RETRY_SECONDS
+    so requests fall back immediately instead of waiting on timeouts.
+    """
+
+    def __init__(self, addr: str = SERVER_ADDR, timeout: float = SERVER_TIMEOUT):
+        self.addr = addr
+        self.timeout = timeout
+        self.down_until = 0.0
+        self.last_error = None
+
+    def request(self, payload: dict) -> dict:
+        if time.monotonic() < self.down_until:
+            raise ModelNotReady(f"Spoiler model server unavailable: {self.last_error}")
+        family, address = parse_server_addr(self.addr)
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+                sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as f:
+                    line = f.readline()
+            if not line:
+                raise ConnectionError("empty response")
+            response = json.loads(line)
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            self.down_until = time.monotonic() + SERVER_RETRY_SECONDS
+            raise ModelNotReady(f"Spoiler model server unavailable: {e}")
+
+        if "error" in response:
+            if response.get("not_ready"):
+                raise ModelNotReady(response["error"])
+            raise RuntimeError(response["error"])
+        return response
+
+    def classify(self, text_comment: str) -> dict:
+        start = time.perf_counter()
+        response = self.request({"op": "classify", "text": text_comment})
+        metrics.SPOILER_INFERENCE.labels("remote").observe(time.perf_counter() - start)
+        return {"label": response["label"], "score": response["score"]}
+
+    def health(self) -> dict:
+        try:
+            return self.request({"op": "health"})
+        except ModelNotReady as e:
+            return {"state": "unavailable", "ready": False, "error": str(e)}
+
+
+server_client = ModelServerClient()
+
+
+def _infer(text_comment: str) -> dict:
+    if MODEL_MODE == "remote":
+        try:
+            return server_client.classify(text_comment)
+        except ModelNotReady:
+            if REMOTE_FALLBACK != "local":
+                raise
+    # Fail fast while warming instead of queueing behind the loader
+    get_classifier()
+    return inference_queue.classify(text_comment)
+
+
+def classify_comment(text_comment: str) -> dict:
+    """Classify one comment (cache first, then the model); returns {"label", "score"}."""
+    cached = result_cache.get(text_comment)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    result = _infer(text_comment)
+    result_cache.put(text_comment, result, (time.perf_counter() - start) * 1000)
+    return result
+
+
+def is_non_spoiler_result(result: dict) -> bool:
     label = result["label"].lower()
     score = result["score"]
 
     if "spoiler" in label or score < THRESHOLD:
         return False
 
-    return True
\ No newline at end of file
+    return True
+
+
+def is_non_spoiler_comment(text_comment: str) -> bool:
+    return is_non_spoiler_result(classify_comment(text_comment))
@@ -0,0 +1,69 @@
+"""
+Local spoiler-model server: holds one copy of the model for every API worker.
+
+    python model_server.py            # listens on SPOILER_SERVER_ADDR
+    SPOILER_MODEL_MODE=remote uvicorn main:app --workers 4
+
+Protocol: one JSON object per line.
+    {"op": "classify", "text": "..."}  -> {"label": "...", "score": 0.99}
+    {"op": "health"}                   -> model status
+"""
+import json
+import os
+import socket
+import socketserver
+
+import model
+
+
+class ClassifyHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("op") == "health":
+                    response = model.get_model_status()
+                elif request.get("op") == "classify":
+                    response = dict(model.inference_queue.classify(request.get("text")))
+                else:
+                    response = {"error": f"unknown op: {request.get('op')}"}
+            except model.ModelNotReady as e:
+                response = {"error": str(e), "not_ready": True}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(addr: str = model.SERVER_ADDR):
+    family, address = model.parse_server_addr(addr)
+    if family == socket.AF_UNIX:
+        if os.path.exists(address):
+            os.remove(address)
+        server = ThreadingUnixServer(address, ClassifyHandler)
+    else:
+        server = ThreadingTCPServer(address, ClassifyHandler)
+
+    # The server always runs the model in-process
+    model.MODEL_MODE = "local"
+    model.start_background_load()
+    print(f"Spoiler model server listening on {addr}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
+
+
+if __name__ == "__main__":
+    serve()
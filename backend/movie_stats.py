@@ -0,0 +1,39 @@
+"""
+Rebuild / verify the MovieStats and MovieMoodStats summary tables.
+
+    python movie_stats.py verify    # list rows that differ from Review / Vote
+    python movie_stats.py rebuild   # recompute both tables from Review / Vote
+"""
+import sys
+from sqlalchemy import text
+from sqlmodel import Session
+
+from database import engine
+
+
+def verify_movie_stats(session: Session):
+    return session.exec(text("CALL verify_movie_stats()")).mappings().all()
+
+
+def rebuild_movie_stats(session: Session):
+    session.exec(text("CALL rebuild_movie_stats()"))
+    session.commit()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    engine.echo = False
+
+    with Session(engine) as session:
+        if command == "rebuild":
+            rebuild_movie_stats(session)
+            print("MovieStats rebuilt.")
+        elif command == "verify":
+            mismatches = verify_movie_stats(session)
+            for row in mismatches:
+                print(dict(row))
+            print(f"{len(mismatches)} mismatched row(s).")
+            sys.exit(1 if mismatches else 0)
+        else:
+            print(__doc__)
+            sys.exit(2)
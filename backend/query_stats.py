@@ -0,0 +1,118 @@
+"""
+Per-request SQL query counter and N+1 detector.
+
+Engine cursor events count statements and DB time into the QueryStats of the
+request being served (set by the middleware in main.py). A fingerprint seen
+N1_THRESHOLD times or more within one request is reported as a likely N+1
+loop (logged, and listed in the X-DB-Repeated header).
+
+QUERY_STATS_HEADERS=1 (dev) adds X-DB-Query-Count / X-DB-Time-Ms /
+X-DB-Repeated to every response.
+
+For tests:
+
+    with assert_max_queries(3):
+        client.get("/movies/")
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+from sql_logging import current_route, fingerprint, normalize_statement
+
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "0") == "1"
+N1_THRESHOLD = int(os.getenv("N1_THRESHOLD", "5"))      # số lần lặp cùng fingerprint trong 1 request
+
+logger = logging.getLogger("query_stats")
+
+# QueryStats of the request being served
+current_stats = ContextVar("current_stats", default=None)
+
+# Collectors opened by count_queries(); they see statements from any thread
+_collectors = []
+_collectors_lock = threading.Lock()
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}            # fingerprint -> normalized statement (first seen)
+
+    def record(self, statement: str, duration_ms: float):
+        fp = fingerprint(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.fingerprints[fp] += 1
+            if fp not in self.statements:
+                self.statements[fp] = normalize_statement(statement)[:300]
+
+    def repeated(self, threshold: int = N1_THRESHOLD):
+        """[(fingerprint, count, statement)] for statements issued at least `threshold` times."""
+        with self._lock:
+            return [(fp, n, self.statements[fp]) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+def install_query_counter(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_stats_start"].pop()) * 1000
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(statement, duration_ms)
+        if _collectors:
+            with _collectors_lock:
+                collectors = list(_collectors)
+            for collector in collectors:
+                collector.record(statement, duration_ms)
+
+
+def report(stats: QueryStats, headers=None):
+    """Log likely N+1 loops of a finished request and, in dev mode, add the response headers."""
+    repeated = stats.repeated()
+    if repeated:
+        method, route = current_route()
+        for fp, n, statement in repeated:
+            logger.warning("Possible N+1 on %s %s: %d x [%s] %s", method, route, n, fp, statement)
+
+    if headers is not None and QUERY_STATS_HEADERS:
+        headers["X-DB-Query-Count"] = str(stats.count)
+        headers["X-DB-Time-Ms"] = f"{stats.total_ms:.1f}"
+        if repeated:
+            headers["X-DB-Repeated"] = ",".join(f"{fp}x{n}" for fp, n, _ in repeated)
+
+
+@contextmanager
+def count_queries():
+    """Collect every statement executed inside the block, whatever thread runs it."""
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(max_count: int):
+    """Fail if the block runs more than `max_count` SQL statements."""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > max_count:
+        details = "\n".join(f"  {n} x {statement}" for statement, n in
+                            ((stats.statements[fp], n) for fp, n in stats.fingerprints.most_common()))
+        raise AssertionError(f"Expected at most {max_count} queries, got {stats.count}:\n{details}")
@@ -0,0 +1,107 @@
+"""
+Asynchronous spoiler moderation for reviews.
+
+With REVIEW_MODERATION_MODE=async, reviews tagged non_spoiler are stored
+with Moderation_status = 'pending' and the request returns right away.
+A background thread classifies them, then publishes the review as is or
+with its tag flipped to 'spoiler'.
+
+Every worker process queues the pending reviews it finds at startup, so a
+review can be queued in several processes; the one that locks its row
+(FOR UPDATE SKIP LOCKED) classifies it, the others skip it. Pending reviews
+are not in MovieStats or the catalog until they are published.
+"""
+import os
+import queue
+import threading
+import time
+from sqlalchemy import text
+from sqlmodel import Session
+
+import model
+from cache import movies_cache
+
+MODERATION_MODE = os.getenv("REVIEW_MODERATION_MODE", "sync")          # sync | async
+RETRY_SECONDS = float(os.getenv("REVIEW_MODERATION_RETRY_SECONDS", "5"))
+
+
+class ModerationWorker:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.flipped = 0
+
+    def start(self, engine):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._engine = engine
+            self._thread = threading.Thread(target=self._run, name="review-moderation", daemon=True)
+            self._thread.start()
+
+        # Pick up reviews left pending by a previous run (moderate() claims each one once)
+        with Session(engine) as session:
+            rows = session.exec(text("""
+                SELECT Movie_id, Customer_id FROM Review WHERE Moderation_status = 'pending'
+            """)).all()
+        for movie_id, customer_id in rows:
+            self.enqueue(movie_id, customer_id)
+
+    def enqueue(self, movie_id: int, customer_id: int):
+        self._queue.put((movie_id, customer_id))
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            movie_id, customer_id = self._queue.get()
+            try:
+                self.moderate(movie_id, customer_id)
+            except model.ModelNotReady:
+                # Model still warming / server down: try again later
+                time.sleep(RETRY_SECONDS)
+                self.enqueue(movie_id, customer_id)
+            except Exception as e:
+                print(f"[Moderation] Failed for movie {movie_id}, customer {customer_id}: {e}")
+
+    def moderate(self, movie_id: int, customer_id: int):
+        with Session(self._engine) as session:
+            # Claim the review: another worker holding the row lock is already
+            # classifying it, and a published review is done
+            row = session.exec(text("""
+                SELECT Comment FROM Review
+                WHERE Movie_id = :mid AND Customer_id = :cid AND Moderation_status = 'pending'
+                FOR UPDATE SKIP LOCKED
+            """), params={"mid": movie_id, "cid": customer_id}).first()
+            if not row:
+                session.rollback()
+                return
+
+            non_spoiler = model.is_non_spoiler_comment(row[0])
+            session.exec(text("""
+                UPDATE Review
+                SET Moderation_status = 'published',
+                    spoiler_tag = IF(:non_spoiler, spoiler_tag, 'spoiler')
+                WHERE Movie_id = :mid AND Customer_id = :cid AND Moderation_status = 'pending'
+            """), params={"mid": movie_id, "cid": customer_id, "non_spoiler": non_spoiler})
+            session.commit()
+        # Its rating is in MovieStats now (trg_moviestats_review_update)
+        movies_cache.invalidate()
+
+        self.processed += 1
+        if not non_spoiler:
+            self.flipped += 1
+
+    def stats(self):
+        return {
+            "mode": MODERATION_MODE,
+            "queue_depth": self.queue_depth(),
+            "processed": self.processed,
+            "flipped_to_spoiler": self.flipped,
+        }
+
+
+moderation_worker = ModerationWorker()
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
-from sqlmodel import Session
-from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Any, Dict
 from sqlalchemy import text
-from database import get_session
+from database import get_async_session
+from cache import products_cache
+from fastapi.responses import StreamingResponse
+from seat_map import seat_map_cache, COMPACT_MEDIA_TYPE
+from seat_events import seat_hub
 
 router = APIRouter(
     prefix="/movies",
@@ -43,17 +47,46 @@ class ProductOut(BaseModel):
     Price: float
     Description: Optional[str] = None
 
+class SeatBitmapOut(BaseModel):
+    rows: int
+    cols: int
+    status_codes: List[str]
+    statuses: str
+    seat_types: List[str]
+    type_runs: List[List[int]]
+    extra: List[Dict[str, Any]] = []
+
 class BookingPageOut(BaseModel):
     movie: MovieShortOut
     showtime: ShowtimeOut
     seats: List[SeatOut]
+    seat_version: str
+    seat_bitmap: Optional[SeatBitmapOut] = None
     products: List[ProductOut]
 
+class SeatDeltaOut(BaseModel):
+    Seat_number: str
+    Seat_type: Optional[str] = None
+    Status: Optional[str] = None
+
+class SeatMapOut(BaseModel):
+    version: str
+    full: bool
+    seats: List[SeatDeltaOut]
+    bitmap: Optional[SeatBitmapOut] = None
+
+
+def wants_compact(request: Request, format: Optional[str]) -> bool:
+    # ?format=compact or Accept: application/vnd.cinema.seatmap+json
+    return format == "compact" or COMPACT_MEDIA_TYPE in request.headers.get("accept", "")
+
 @router.get("/{movie_id}/{showtime_id}", response_model=BookingPageOut) 
-def get_booking_page( 
+async def get_booking_page( 
     movie_id: int, 
     showtime_id: int, 
-    session: Session = Depends(get_session) 
+    request: Request,
+    format: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session) # primary: seat status must be current
 ): 
     try: 
         # Movie 
@@ -64,22 +97,21 @@ def get_booking_page(
                            Duration 
                            FROM Movie
                             WHERE Movie_id = :mid """) 
-        movie = session.exec(movie_query, params = {"mid": movie_id}).mappings().first() 
+        movie = (await session.execute(movie_query, {"mid": movie_id})).mappings().first() 
         if not movie: 
             raise HTTPException(404, "Movie not found") 
         
         # Showtime 
         showtime_proc = text("CALL GetShowtimeInfo(:mid, :sid)") 
         params1 = {"mid": movie_id, "sid": showtime_id} 
-        showtime_result = session.exec(showtime_proc, params=params1) 
+        showtime_result = await session.execute(showtime_proc, params1) 
         showtime = showtime_result.mappings().first() 
         if not showtime: raise HTTPException(404, "Showtime not found") 
 
-        # Seats 
-        seat_proc = text("CALL GetShowtimeSeats(:mid, :sid)") 
-        params2 = {"mid": movie_id, "sid": showtime_id} 
-        seats_result = session.exec(seat_proc, params = params2) 
-        seats = seats_result.mappings().all() 
+        # Seats (snapshot cache, invalidated by the receipt write paths)
+        seat_map = await seat_map_cache.get(
+            session, movie_id, showtime_id, compact=wants_compact(request, format)
+        )
 
         # Products
         product_query = text("""
@@ -90,12 +122,54 @@ def get_booking_page(
                 Description
             FROM Product
         """)
-        products = session.exec(product_query).mappings().all()
+        async def load_products(s):
+            return [dict(row) for row in (await s.execute(product_query)).mappings().all()]
+
+        products = await products_cache.get_or_load_async("all", load_products, session)
         return { "movie": movie, 
                 "showtime": showtime, 
-                "seats": seats,
+                "seats": seat_map["seats"],
+                "seat_version": seat_map["version"],
+                "seat_bitmap": seat_map.get("bitmap"),
                  "products": products } 
     except Exception as e: 
         raise HTTPException(500, str(e))
 
 
+@router.get("/{movie_id}/{showtime_id}/seats", response_model=SeatMapOut)
+async def get_seat_map(
+    movie_id: int,
+    showtime_id: int,
+    request: Request,
+    since: Optional[str] = None,
+    format: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Seat statuses for polling. Pass the `version` of the previous response as
+    `since` to receive only the seats that changed (`full` is false); an unknown
+    or too old version returns the whole map.
+
+    `format=compact` (or `Accept: application/vnd.cinema.seatmap+json`) returns a
+    full map as `bitmap` (see seat_map.encode_bitmap) instead of `seats`.
+    """
+    try:
+        return await seat_map_cache.get(
+            session, movie_id, showtime_id, since, compact=wants_compact(request, format)
+        )
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+
+@router.get("/{movie_id}/{showtime_id}/seats/stream")
+async def stream_seat_map(movie_id: int, showtime_id: int, request: Request):
+    """
+    Server-Sent Events of seat status changes: a `snapshot` event with the whole
+    map, then `delta` events with the changed seats. EventSource resends the
+    last event id on reconnect, which resumes from that version.
+    """
+    return StreamingResponse(
+        seat_hub.stream(movie_id, showtime_id, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
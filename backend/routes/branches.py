@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from sqlmodel import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from sqlalchemy import text
-from database import get_session
+from database import get_session, get_async_read_session
 router = APIRouter(
     prefix="/branches",
     tags =["branches - publics"]
@@ -40,6 +41,8 @@ class ShowtimeInBranchOut(BaseModel):
     Subtitle: str
     Hall_number: int
     Hall_type: str
+    Total_seats: Optional[int] = None
+    Available_seats: Optional[int] = None
 
 class MovieInBranchOut(BaseModel):
     Movie_id: int
@@ -63,13 +66,13 @@ class BranchListResponse(BaseModel):
     limit: int
 
 @router.get("/", response_model=BranchListResponse)
-def get_branches(
+async def get_branches(
     search: Optional[str] = None,
     sort_by: Optional[str] = "Branch_id",
     order: Optional[str] = "ASC",
     page: int = 1,
     limit: int = 10,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     try:
         # 1. Call the Stored Procedure
@@ -84,12 +87,12 @@ def get_branches(
         }
         
         # Execute the procedure and get the main result set (branches)
-        result = session.exec(text(sql), params=params)
+        result = await session.execute(text(sql), params)
         branches = result.mappings().all()
         
         # 2. Get the Total Count from the session variable
         # We need to execute a separate SELECT to get the value of @total
-        total_result = session.exec(text("SELECT @total")).first()
+        total_result = (await session.execute(text("SELECT @total"))).first()
         total_count = total_result[0] if total_result else 0
 
         return {
@@ -161,9 +164,9 @@ def delete_branch(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{branch_id}", response_model=BranchDetailOut)
-def get_movie_by_id(
+async def get_movie_by_id(
     branch_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     try:
         # Branch
@@ -180,7 +183,7 @@ def get_movie_by_id(
             WHERE b.Branch_id = :bid
             GROUP BY b.Branch_id, b.City, b.Address, b.Name, b.Admin_id
         """
-        branch = session.exec(text(branch_sql), params={"bid": branch_id}).mappings().first()
+        branch = (await session.execute(text(branch_sql), {"bid": branch_id})).mappings().first()
 
         if not branch:
             raise HTTPException(status_code=404, detail="Branch not found")
@@ -205,7 +208,10 @@ def get_movie_by_id(
                 s.Subtitle,
 
                 h.Hall_number,
-                h.Type AS Hall_type
+                h.Type AS Hall_type,
+
+                sa.Total_seats,
+                sa.Available_seats
 
             FROM Showtime s
             JOIN Movie m
@@ -213,12 +219,14 @@ def get_movie_by_id(
             JOIN Hall h
                 ON h.Branch_id = s.Branch_id
                AND h.Hall_number = s.Hall_number
+            LEFT JOIN ShowtimeAvailability sa
+                ON sa.Showtime_id = s.Showtime_id
 
             WHERE s.Branch_id = :bid
             ORDER BY m.Movie_id, s.Date, s.Start_time
         """
 
-        rows = session.exec(text(showtime_sql), params={"bid": branch_id}).mappings().all()
+        rows = (await session.execute(text(showtime_sql), {"bid": branch_id})).mappings().all()
 
         movies_dict = {}
 
@@ -246,6 +254,8 @@ def get_movie_by_id(
                 "Subtitle": r["Subtitle"],
                 "Hall_number": r["Hall_number"],
                 "Hall_type": r["Hall_type"],
+                "Total_seats": r["Total_seats"],
+                "Available_seats": r["Available_seats"],
             })
 
         return {
@@ -272,9 +282,9 @@ class HallUpdate(HallBase):
     pass
 
 @router.get("/{branch_id}/halls", response_model=List[HallBase])
-def get_halls_by_branch(
+async def get_halls_by_branch(
     branch_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     try:
         sql = """
@@ -283,7 +293,7 @@ def get_halls_by_branch(
             WHERE Branch_id = :bid
             ORDER BY Hall_number ASC
         """
-        result = session.exec(text(sql), params={"bid": branch_id}).mappings().all()
+        result = (await session.execute(text(sql), {"bid": branch_id})).mappings().all()
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from sqlmodel import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from sqlalchemy import text
-from database import get_session
+from database import get_async_read_session
+from cache import events_cache
 
 router = APIRouter(
     prefix="/events",
@@ -20,8 +21,8 @@ class EventOut(BaseModel):
     Type: str
 
 @router.get("/", response_model=List[EventOut])
-def get_events(
-    session: Session = Depends(get_session)
+async def get_events(
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     try:
         base_query = """
@@ -39,19 +40,20 @@ def get_events(
 
         base_query += " ORDER BY Event_id ASC"
 
-        result = session.exec(text(base_query))
-        rows = result.mappings().all()   # list[dict-like]
+        async def load_events(s):
+            result = await s.execute(text(base_query))
+            return [dict(row) for row in result.mappings().all()]
 
-        return rows
+        return await events_cache.get_or_load_async("all", load_events, session)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
 @router.get("/{event_id}", response_model=EventOut)
-def get_movie_by_id(
+async def get_movie_by_id(
     event_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     try:
         query = text("""
@@ -67,7 +69,7 @@ def get_movie_by_id(
             WHERE Event_id = :mid
         """)
 
-        result = session.exec(query, params={"mid": event_id})
+        result = await session.execute(query, {"mid": event_id})
         row = result.mappings().first()
 
         if not row:
@@ -7,6 +7,8 @@ from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 from sqlalchemy import text
 
+from metrics import time_external
+
 def send_receipt_email_helper(receipt_id: int, customer_id: int, session, tickets: list):
     """
     Helper function to fetch receipt details and send a confirmation email.
@@ -149,7 +151,7 @@ def send_ticket_email(receiver_email, ticket_info):
     try:
         # Tạo kết nối bảo mật
         context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+        with time_external("smtp", "send_ticket"), smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
             server.starttls(context=context)  # Nâng cấp lên kết nối bảo mật TLS
             server.login(SENDER_EMAIL, SENDER_PASSWORD)
             server.sendmail(SENDER_EMAIL, receiver_email, msg.as_string())
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlmodel import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-from sqlalchemy import text
-from database import get_session
+from sqlalchemy import text, bindparam
+from database import get_session, get_async_read_session
+from cache import movies_cache
 from datetime import datetime
-from model import is_non_spoiler_comment
+from model import is_non_spoiler_comment, ModelNotReady
+from review_moderation import MODERATION_MODE, moderation_worker
 router = APIRouter(
     prefix="/movies",
     tags =["movies - publics"]
@@ -65,9 +69,126 @@ class MovieDetailOut(BaseModel):
     reviews: List[ReviewOut]
 
 
+async def get_movie_stats(session: AsyncSession, movie_ids: List[int]):
+    """
+    Đọc rating trung bình và top 2 mood của các phim từ MovieStats / MovieMoodStats
+    (được trigger cập nhật khi có review hoặc vote).
+    Trả về (ratings, moods_by_movie) dạng dict theo Movie_id.
+    """
+    ratings = {}
+    moods_by_movie = {}
+    if not movie_ids:
+        return ratings, moods_by_movie
+
+    rating_query = text("""
+        SELECT Movie_id, Rating_sum / NULLIF(Rating_count, 0)
+        FROM MovieStats
+        WHERE Movie_id IN :mids
+    """).bindparams(bindparam("mids", expanding=True))
+    for mid, avg_rating in (await session.execute(rating_query, {"mids": movie_ids})).all():
+        ratings[mid] = avg_rating
+
+    # Top 2 moods per movie, ranked with a window function
+    mood_query = text("""
+        SELECT Movie_id, Mood_id, Name, Symbol, count
+        FROM (
+            SELECT
+                s.Movie_id, m.Mood_id, m.Name, m.Symbol, s.Vote_count AS count,
+                ROW_NUMBER() OVER (
+                    PARTITION BY s.Movie_id
+                    ORDER BY s.Vote_count DESC, m.Mood_id ASC
+                ) AS rn
+            FROM MovieMoodStats s
+            JOIN Mood m ON m.Mood_id = s.Mood_id
+            WHERE s.Movie_id IN :mids AND s.Vote_count > 0
+        ) ranked
+        WHERE rn <= 2
+        ORDER BY Movie_id, rn
+    """).bindparams(bindparam("mids", expanding=True))
+    for m in (await session.execute(mood_query, {"mids": movie_ids})).all():
+        moods_by_movie.setdefault(m[0], []).append(
+            MoodOut(mood_id=m[1], name=m[2], symbol=m[3], count=m[4])
+        )
+
+    return ratings, moods_by_movie
+
+
+async def query_movies(
+    session: AsyncSession,
+    language: Optional[str] = None,
+    age_rating: Optional[str] = None,
+    search: Optional[str] = None,
+) -> List[MovieOut]:
+    """Đọc danh sách phim trực tiếp từ MySQL (không qua cache)."""
+    base_query = """
+        SELECT 
+            m.Movie_id,
+            m.Director,
+            m.Title,
+            m.Image,
+            DATE_FORMAT(m.Release_date, '%d/%m/%Y') AS Release_date,
+            m.Language,
+            m.Age_rating,
+            m.Duration,
+            m.Description,
+            
+            (SELECT GROUP_CONCAT(AActor SEPARATOR ', ') FROM MovieActor ma WHERE ma.Movie_id = m.Movie_id) AS Actors,
+            (SELECT GROUP_CONCAT(AFormat SEPARATOR ', ') FROM MovieFormat mf WHERE mf.Movie_id = m.Movie_id) AS Formats,
+            (SELECT GROUP_CONCAT(ASubtitle SEPARATOR ', ') FROM MovieSubtitle ms WHERE ms.Movie_id = m.Movie_id) AS Subtitles,
+            (SELECT GROUP_CONCAT(AGenres SEPARATOR ', ') FROM MovieGenres mg WHERE mg.Movie_id = m.Movie_id) AS Genres
+
+        FROM Movie m
+        WHERE 1 = 1
+    """
+    params = {}
+
+    if language:
+        base_query += " AND m.Language = :lang"
+        params["lang"] = language
+
+    if age_rating:
+        base_query += " AND m.Age_rating = :age"
+        params["age"] = age_rating
+
+    if search:
+        base_query += " AND m.Title LIKE :search"
+        params["search"] = f"%{search}%"
+
+    base_query += " ORDER BY m.Movie_id ASC"
+
+    result = await session.execute(text(base_query), params)
+    rows = result.mappings().all()   # list[dict-like]
+    
+    # Ratings and top moods for every returned movie, read from MovieStats
+    ratings, moods_by_movie = await get_movie_stats(session, [row['Movie_id'] for row in rows])
+
+    # Transform rows to match MovieOut (split strings to lists)
+    movies = []
+    for row in rows:
+        movies.append(MovieOut(
+            Movie_id=row['Movie_id'],
+            Director=row['Director'],
+            Title=row['Title'],
+            Image=row['Image'],
+            Release_date=row['Release_date'],
+            Language=row['Language'],
+            Age_rating=row['Age_rating'],
+            Duration=row['Duration'],
+            Description=row['Description'],
+            Actors=row['Actors'].split(", ") if row['Actors'] else [],
+            Formats=row['Formats'].split(", ") if row['Formats'] else [],
+            Subtitles=row['Subtitles'].split(", ") if row['Subtitles'] else [],
+            Genres=row['Genres'].split(", ") if row['Genres'] else [],
+            Average_rating=float(ratings.get(row['Movie_id']) or 0.0),
+            Top_moods=moods_by_movie.get(row['Movie_id'], [])
+        ))
+
+    return movies
+
+
 @router.get("/", response_model=List[MovieOut])
-def get_movies(
-    session: Session = Depends(get_session),
+async def get_movies(
+    session: AsyncSession = Depends(get_async_read_session),
     language: Optional[str] = None,
     age_rating: Optional[str] = None,
     search: Optional[str] = None,
@@ -80,93 +201,17 @@ def get_movies(
         - ?search=Kong
     """
     try:
-        base_query = """
-            SELECT 
-                m.Movie_id,
-                m.Director,
-                m.Title,
-                m.Image,
-                DATE_FORMAT(m.Release_date, '%d/%m/%Y') AS Release_date,
-                m.Language,
-                m.Age_rating,
-                m.Duration,
-                m.Description,
-                
-                (SELECT GROUP_CONCAT(AActor SEPARATOR ', ') FROM MovieActor ma WHERE ma.Movie_id = m.Movie_id) AS Actors,
-                (SELECT GROUP_CONCAT(AFormat SEPARATOR ', ') FROM MovieFormat mf WHERE mf.Movie_id = m.Movie_id) AS Formats,
-                (SELECT GROUP_CONCAT(ASubtitle SEPARATOR ', ') FROM MovieSubtitle ms WHERE ms.Movie_id = m.Movie_id) AS Subtitles,
-                (SELECT GROUP_CONCAT(AGenres SEPARATOR ', ') FROM MovieGenres mg WHERE mg.Movie_id = m.Movie_id) AS Genres
-
-            FROM Movie m
-            WHERE 1 = 1
-        """
-        params = {}
-
-        if language:
-            base_query += " AND m.Language = :lang"
-            params["lang"] = language
-
-        if age_rating:
-            base_query += " AND m.Age_rating = :age"
-            params["age"] = age_rating
-
-        if search:
-            base_query += " AND m.Title LIKE :search"
-            params["search"] = f"%{search}%"
-
-        base_query += " ORDER BY m.Movie_id ASC"
-
-        result = session.exec(text(base_query), params= params)
-        rows = result.mappings().all()   # list[dict-like]
-        
-        # Transform rows to match MovieOut (split strings to lists)
-        movies = []
-        for row in rows:
-            # Fetch average rating
-            rating_query = text("SELECT AVG(Rating) FROM Review WHERE Movie_id = :mid")
-            avg_rating = session.exec(rating_query, params={"mid": row['Movie_id']}).first()[0] or 0.0
-
-            # Fetch top 2 moods
-            mood_query = text("""
-                SELECT m.Mood_id, m.Name, m.Symbol, COUNT(v.Mood_id) as count
-                FROM Mood m
-                JOIN Vote v ON m.Mood_id = v.Mood_id
-                WHERE v.Movie_id = :mid
-                GROUP BY m.Mood_id, m.Name, m.Symbol
-                ORDER BY count DESC
-                LIMIT 2
-            """)
-            mood_rows = session.exec(mood_query, params={"mid": row['Movie_id']}).all()
-            top_moods = [
-                MoodOut(mood_id=m[0], name=m[1], symbol=m[2], count=m[3])
-                for m in mood_rows
-            ]
-
-            movies.append(MovieOut(
-                Movie_id=row['Movie_id'],
-                Director=row['Director'],
-                Title=row['Title'],
-                Image=row['Image'],
-                Release_date=row['Release_date'],
-                Language=row['Language'],
-                Age_rating=row['Age_rating'],
-                Duration=row['Duration'],
-                Description=row['Description'],
-                Actors=row['Actors'].split(", ") if row['Actors'] else [],
-                Formats=row['Formats'].split(", ") if row['Formats'] else [],
-                Subtitles=row['Subtitles'].split(", ") if row['Subtitles'] else [],
-                Genres=row['Genres'].split(", ") if row['Genres'] else [],
-                Average_rating=float(avg_rating),
-                Top_moods=top_moods
-            ))
-
-        return movies
+        return await movies_cache.get_or_load_async(
+            (language, age_rating, search),
+            lambda s: query_movies(s, language, age_rating, search),
+            session
+        )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/{movie_id}", response_model=MovieDetailOut)
-def get_movie_detail(movie_id: int, tag: Optional[str] = None, session: Session = Depends(get_session)):
+async def get_movie_detail(movie_id: int, tag: Optional[str] = None, session: AsyncSession = Depends(get_async_read_session)):
     try:
         # 1) Lấy movie detail with multi-value attributes
         movie_query = text("""
@@ -190,11 +235,13 @@ def get_movie_detail(movie_id: int, tag: Optional[str] = None, session: Session
             WHERE m.Movie_id = :mid
         """)
 
-        row = session.exec(movie_query, params={"mid": movie_id}).mappings().first()
+        row = (await session.execute(movie_query, {"mid": movie_id})).mappings().first()
 
         if not row:
             raise HTTPException(status_code=404, detail="Movie not found")
 
+        ratings, moods_by_movie = await get_movie_stats(session, [movie_id])
+
         # Transform row to MovieOut
         movie = MovieOut(
             Movie_id=row['Movie_id'],
@@ -209,15 +256,17 @@ def get_movie_detail(movie_id: int, tag: Optional[str] = None, session: Session
             Actors=row['Actors'].split(", ") if row['Actors'] else [],
             Formats=row['Formats'].split(", ") if row['Formats'] else [],
             Subtitles=row['Subtitles'].split(", ") if row['Subtitles'] else [],
-            Genres=row['Genres'].split(", ") if row['Genres'] else []
+            Genres=row['Genres'].split(", ") if row['Genres'] else [],
+            Average_rating=float(ratings.get(movie_id) or 0.0),
+            Top_moods=moods_by_movie.get(movie_id, [])
         )
 
         showtime_proc = text("CALL GetMovieShowtimes(:mid)")
-        showtimes_result = session.exec(showtime_proc, params={"mid": movie_id})
+        showtimes_result = await session.execute(showtime_proc, {"mid": movie_id})
         showtimes = showtimes_result.mappings().all()
 
         review_proc = text("CALL GetMovieReviews(:mid,:spoiler)")
-        review_result = session.exec(review_proc, params={"mid": movie_id, "spoiler": tag})
+        review_result = await session.execute(review_proc, {"mid": movie_id, "spoiler": tag})
         reviews = review_result.mappings().all()
 
         return {
@@ -265,11 +314,23 @@ def create_review(movie_id: int,
                 detail="You must purchase a ticket for this movie before leaving a review."
             )
 
-        if data.spoiler == "non_spoiler" and not is_non_spoiler_comment(data.comment):
-            return {
-                "result": False,
-                "message": "Comment submitted may contains spoilers, please remove spoiler content or change spoiler tag."
-                }
+        # Async moderation: store as pending, a background worker classifies it later
+        moderate_later = data.spoiler == "non_spoiler" and MODERATION_MODE == "async"
+
+        if data.spoiler == "non_spoiler" and not moderate_later:
+            try:
+                non_spoiler = is_non_spoiler_comment(data.comment)
+            except ModelNotReady:
+                # Model is still warming up: don't block the request, ask the client to retry
+                return {
+                    "result": False,
+                    "message": "Spoiler check is starting up, please try again in a moment."
+                    }
+            if not non_spoiler:
+                return {
+                    "result": False,
+                    "message": "Comment submitted may contains spoilers, please remove spoiler content or change spoiler tag."
+                    }
         
         proc = text("""
             CALL create_review(
@@ -290,8 +351,22 @@ def create_review(movie_id: int,
             "comment": data.comment,
             "spoiler": data.spoiler
         })
+        if moderate_later:
+            session.exec(text("""
+                UPDATE Review SET Moderation_status = 'pending'
+                WHERE Movie_id = :movie_id AND Customer_id = :customer_id
+            """), params={"movie_id": movie_id, "customer_id": data.customer_id})
         session.commit()
 
+        if moderate_later:
+            moderation_worker.enqueue(movie_id, data.customer_id)
+            return JSONResponse(status_code=202, content={
+                "result": True,
+                "status": "pending",
+                "message": "Review received and is being checked for spoilers"
+            })
+
+        movies_cache.invalidate()
         return {
             "result": True,
             "message": "Review created successfully"
@@ -302,3 +377,18 @@ def create_review(movie_id: int,
         raise HTTPException(status_code=400, detail=str(e))
 
 
+
+
+@router.get("/{movie_id}/reviews/{customer_id}/status")
+def get_review_status(movie_id: int, customer_id: int, session: Session = Depends(get_session)):
+    """Client polls this after a 202 from create_review to get the moderation result."""
+    row = session.exec(text("""
+        SELECT Moderation_status, spoiler_tag
+        FROM Review
+        WHERE Movie_id = :mid AND Customer_id = :cid
+    """), params={"mid": movie_id, "cid": customer_id}).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    return {"status": row[0], "spoiler_tag": row[1]}
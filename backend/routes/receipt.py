@@ -2,12 +2,15 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 from sqlmodel import Session
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from typing import Optional, List
 import hmac, hashlib, json
+import os, threading, time
 
-from database import get_session
-from .zalopay import create_zalopay_order, query_zalopay_order, config as zp_config
+from database import engine, get_session, retry_on_lock_conflict
+from seat_map import seat_map_cache
+from seat_holds import hold_store, bump_seat_versions
+from .zalopay import create_zalopay_order, query_zalopay_order, config as zp_config, TRANSPORT_ERROR
 from routes.mail_service import send_ticket_email, send_receipt_email_helper
 
 router = APIRouter(
@@ -15,6 +18,11 @@ router = APIRouter(
     tags=["receipts"]
 )
 
+# Pending ZaloPay receipts older than this (giây) are checked with ZaloPay and
+# their seats released unless paid; ZaloPay orders expire after 15 minutes
+PENDING_PAYMENT_TTL = int(os.getenv("PENDING_PAYMENT_TTL", "900"))
+PENDING_SWEEP_INTERVAL = float(os.getenv("PENDING_SWEEP_INTERVAL", "60"))
+
 class ProductItem(BaseModel):
     product_id: int
     quantity: int
@@ -43,6 +51,234 @@ class ReceiptCreateOut(BaseModel):
     payment_url: Optional[str] = None
 
 
+def seats_by_showtime(tickets: List[TicketItem]):
+    # Showtimes and seat numbers sorted, so holds are taken in key order like the seat locks
+    seats = {}
+    for t in tickets:
+        seats.setdefault(t.showtime_id, set()).add(t.seat_number)
+    return {showtime_id: sorted(seats[showtime_id]) for showtime_id in sorted(seats)}
+
+
+def release_holds(session: Session, held_seats, customer_id: int):
+    """Give up the customer's holds on the cart's seats, bump the seat-map versions and commit."""
+    for showtime_id, seats in held_seats.items():
+        hold_store.release(session, showtime_id, seats, customer_id)
+    bump_seat_versions(session, held_seats)
+    session.commit()
+
+
+def invalidate_seat_maps(showtimes):
+    """Drop cached seat maps of (movie_id, showtime_id) pairs after a commit that changed their seats."""
+    for movie_id, showtime_id in showtimes:
+        seat_map_cache.invalidate(movie_id, showtime_id)
+
+
+def release_receipt(session: Session, receipt_id: int):
+    """
+    Set the receipt's seats back to AVAILABLE and delete its tickets, products
+    and the receipt itself (no commit). Returns the (movie_id, showtime_id) pairs touched.
+    The number of statements does not depend on the number of tickets.
+    """
+    showtimes = session.exec(text("""
+        SELECT DISTINCT Movie_id, Showtime_id FROM Ticket WHERE Receipt_id = :rid
+    """), params={"rid": receipt_id}).all()
+
+    # One joined UPDATE for all seats, Hall capacity adjusted once per hall
+    session.exec(text("CALL release_receipt_seats(:rid)"), params={"rid": receipt_id})
+
+    # Manually delete dependent records because DB doesn't have ON DELETE CASCADE
+    session.exec(text("DELETE FROM Ticket WHERE Receipt_id = :rid"), params={"rid": receipt_id})
+    session.exec(text("DELETE FROM OrderProduct WHERE Receipt_id = :rid"), params={"rid": receipt_id})
+
+    # Delete receipt
+    session.exec(text("DELETE FROM Receipt WHERE Receipt_id = :rid"), params={"rid": receipt_id})
+    return {(row[0], row[1]) for row in showtimes}
+
+
+def book_cart(session: Session, data: CreateReceiptRequest, held_seats) -> int:
+    """
+    One booking transaction (committed here): claim the holds, lock the seats,
+    then create the receipt with create_receipt_bulk. Returns the receipt id.
+    """
+    # Claim the seats for this customer in the hold store: seats held by
+    # another customer are rejected before anything is booked. All showtimes
+    # or none: the memory store is not undone by the rollback.
+    # No seat-map version bump here: create_receipt_bulk bumps the counters of
+    # the booked seats, and a failed booking bumps in release_holds (bumping
+    # slot 0 before the seat locks would take the counter rows out of key order)
+    acquired = {}
+    for showtime_id, seats in held_seats.items():
+        conflicts = hold_store.acquire(session, showtime_id, seats, data.customer_id)
+        if conflicts:
+            for sid, numbers in acquired.items():
+                hold_store.release(session, sid, numbers, data.customer_id)
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Seats held by another customer", "seats": conflicts}
+            )
+        acquired[showtime_id] = seats
+    
+    # Lock the requested seats in primary-key order, so concurrent bookings of
+    # overlapping seats queue up instead of deadlocking, and report taken seats
+    if data.tickets:
+        keys = sorted({(t.showtime_id, t.branch_id, t.hall_number, t.seat_number) for t in data.tickets})
+        if len(keys) != len(data.tickets):
+            raise HTTPException(status_code=400, detail="The same seat is in the cart more than once")
+        rows = session.exec(text("""
+            SELECT Showtime_id, Branch_id, Hall_number, Seat_number, Status
+            FROM ShowtimeSeat
+            WHERE (Showtime_id, Branch_id, Hall_number, Seat_number) IN :keys
+            ORDER BY Showtime_id, Branch_id, Hall_number, Seat_number
+            FOR UPDATE
+        """).bindparams(bindparam("keys", expanding=True)), params={"keys": keys}).all()
+        status = {tuple(row[:4]): row[4] for row in rows}
+        taken = [k[3] for k in keys if status.get(k) != "AVAILABLE"]
+        if taken:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Seat already taken", "seats": taken}
+            )
+    
+    # Whole cart in one round trip: create_receipt_bulk books the seats,
+    # inserts tickets/products set-based and marks the voucher used
+    initial_status = "Paid" if data.method != "ZALOPAY" else "Pending"
+    result = session.exec(text("""
+        CALL create_receipt_bulk(
+            :receipt_date, :method, :status, :customer_id, :cv_id, :tickets, :products
+        )
+    """), params={
+        "receipt_date": data.receipt_date,
+        "method": data.method,
+        "status": initial_status,
+        "customer_id": data.customer_id,
+        "cv_id": data.cv_id,
+        "tickets": json.dumps([{
+            "price": t.price,
+            "movie_id": t.movie_id,
+            "showtime_id": t.showtime_id,
+            "branch_id": t.branch_id,
+            "hall_number": t.hall_number,
+            "seat_number": t.seat_number
+        } for t in data.tickets]),
+        "products": json.dumps([
+            {"product_id": p.product_id, "quantity": p.quantity} for p in data.products
+        ])
+    }).first()
+    
+    receipt_id = result[0] if result else None
+    
+    if not receipt_id:
+        raise Exception("Failed to create receipt")
+    
+    session.commit()
+    return receipt_id
+
+
+def place_booking(session: Session, data: CreateReceiptRequest) -> int:
+    """
+    book_cart with deadlock retries, then drop the cart's holds. The holds are
+    dropped whether or not the booking succeeds: a failed booking must not
+    keep the seats held for SEAT_HOLD_TTL.
+    """
+    held_seats = seats_by_showtime(data.tickets)
+    try:
+        receipt_id = retry_on_lock_conflict(session, lambda: book_cart(session, data, held_seats))
+    except Exception:
+        session.rollback()
+        try:
+            release_holds(session, held_seats, data.customer_id)
+        except Exception as e:
+            session.rollback()
+            print(f"[Holds] Could not release holds of customer {data.customer_id}: {e}")
+        raise
+
+    # Seats are BOOKED now, the holds are no longer needed
+    release_holds(session, held_seats, data.customer_id)
+    return receipt_id
+
+
+def discard_receipt(session: Session, receipt_id: int):
+    """Release the seats of a receipt that will never be paid, delete it and commit."""
+    print(f"[ZaloPay] Releasing seats of Receipt #{receipt_id}")
+    showtimes = release_receipt(session, receipt_id)
+    session.commit()
+    invalidate_seat_maps(showtimes)
+
+
+def create_payment_url(session: Session, data: CreateReceiptRequest, receipt_id: int) -> str:
+    """Create the ZaloPay order of a booked receipt and return its payment URL."""
+    # Calculate total amount
+    total_amount = 0
+    items = []
+    
+    for t in data.tickets:
+        total_amount += t.price
+        items.append({
+            "itemid": f"TKT_{t.showtime_id}",
+            "itemname": f"Ticket {t.seat_number}",
+            "itemprice": int(t.price),
+            "itemquantity": 1
+        })
+    
+    # Fetch product prices and names from DB in one query
+    prod_rows = {}
+    if data.products:
+        prod_rows = {row[0]: row for row in session.exec(
+            text("SELECT Product_id, Name, Price FROM Product WHERE Product_id IN :pids")
+            .bindparams(bindparam("pids", expanding=True)),
+            params={"pids": [p.product_id for p in data.products]}
+        ).all()}
+    
+    for p in data.products:
+        prod_data = prod_rows.get(p.product_id)
+        p_name = prod_data[1] if prod_data else "Product"
+        p_price = float(prod_data[2]) if prod_data else 0
+        
+        total_amount += p_price * p.quantity
+        items.append({
+            "itemid": f"PRD_{p.product_id}",
+            "itemname": p_name,
+            "itemprice": int(p_price), 
+            "itemquantity": p.quantity
+        })
+    
+    # Apply Voucher Discount to total_amount
+    if data.cv_id:
+        voucher_query = text("""
+            SELECT v.Discount 
+            FROM Voucher v 
+            JOIN CustomerVoucher cv ON v.Voucher_id = cv.Voucher_id 
+            WHERE cv.CV_id = :cvid
+        """)
+        v_row = session.exec(voucher_query, params={"cvid": data.cv_id}).first()
+        if v_row:
+            discount_percent = float(v_row[0])
+            total_amount = total_amount * (1 - discount_percent / 100)
+    
+    # ZaloPay requires amount to be at least 1
+    total_amount = max(1, int(total_amount))
+
+    # Construct URLs for frontend
+    frontend_url = "http://localhost:3000"
+    redirect_url = f"{frontend_url}/bookings/confirmation?bookingId={receipt_id}"
+    callback_url = "http://localhost:8000/receipts/callback" 
+    
+    print(f"[ZaloPay] Creating order for Receipt #{receipt_id}, Amount: {total_amount}")
+    zp_result = create_zalopay_order(
+        total_amount, items, receipt_id, 
+        redirect_url=redirect_url,
+        callback_url=callback_url
+    )
+    
+    print(f"[ZaloPay] Response: {zp_result}")
+    
+    if zp_result.get("returncode") != 1:
+        error_msg = zp_result.get("returnmessage", "Unknown error")
+        print(f"[ZaloPay] Creation Failed: {error_msg}")
+        raise HTTPException(status_code=400, detail=f"ZaloPay Error: {error_msg}")
+    return zp_result.get("orderurl")
+
+
 @router.post("/", response_model=ReceiptCreateOut)
 def create_receipt_endpoint(
     data: CreateReceiptRequest,
@@ -51,8 +287,8 @@ def create_receipt_endpoint(
     """
     Create a receipt with products and tickets.
     
-    The stored procedure create_receipt expects one product and one ticket per call.
-    We'll call it for each ticket, and handle products separately if needed.
+    The whole cart is sent to the stored procedure create_receipt_bulk as JSON,
+    so the number of round trips does not grow with the cart size.
     """
     try:
         receipt_id = None
@@ -64,193 +300,19 @@ def create_receipt_endpoint(
                 detail="Receipt must contain at least one ticket or product"
             )
         
-        # Strategy: Call create_receipt for the first ticket (if exists)
-        # This creates the receipt and first ticket
-        # Then add remaining tickets and all products separately
-        
-        if data.tickets:
-            # Call create_receipt with first ticket
-            first_ticket = data.tickets[0]
-            first_product = data.products[0] if data.products else None
-            
-            # Determine initial status
-            initial_status = "Paid" if data.method != "ZALOPAY" else "Pending"
-            
-            # Get the created receipt ID from the stored procedure result
-            result = session.exec(text("""
-                CALL create_receipt(
-                    :receipt_date, :method, :status, :customer_id, :cv_id,
-                    :product_id, :quantity,
-                    :price, :movie_id, :showtime_id, :branch_id, :hall_number, :seat_number
-                )
-            """), params={
-                "receipt_date": data.receipt_date,
-                "method": data.method,
-                "status": initial_status,
-                "customer_id": data.customer_id,
-                "cv_id": data.cv_id,
-                "product_id": first_product.product_id if first_product else None,
-                "quantity": first_product.quantity if first_product else None,
-                "price": first_ticket.price,
-                "movie_id": first_ticket.movie_id,
-                "showtime_id": first_ticket.showtime_id,
-                "branch_id": first_ticket.branch_id,
-                "hall_number": first_ticket.hall_number,
-                "seat_number": first_ticket.seat_number
-            }).first()
-            
-            receipt_id = result[0] if result else None
-            
-            if not receipt_id:
-                raise Exception("Failed to create receipt")
-            
-            # Add remaining tickets (if any)
-            for ticket in data.tickets[1:]:
-                session.exec(text("""
-                    CALL create_ticket(
-                        :price, :receipt_id, :movie_id, :showtime_id, 
-                        :branch_id, :hall_number, :seat_number
-                    )
-                """), params={
-                    "price": ticket.price,
-                    "receipt_id": receipt_id,
-                    "movie_id": ticket.movie_id,
-                    "showtime_id": ticket.showtime_id,
-                    "branch_id": ticket.branch_id,
-                    "hall_number": ticket.hall_number,
-                    "seat_number": ticket.seat_number
-                })
-            
-            # Add remaining products (if any)
-            for product in data.products[1:] if first_product else data.products:
-                session.exec(text("""
-                    CALL create_order_product(:receipt_id, :product_id, :quantity)
-                """), params={
-                    "receipt_id": receipt_id,
-                    "product_id": product.product_id,
-                    "quantity": product.quantity
-                })
-        
-        else:
-            # No tickets, only products - need to create receipt header manually
-            rec_date_query = text("SELECT STR_TO_DATE(:date, '%d/%m/%Y')")
-            rec_date_result = session.exec(rec_date_query, params={"date": data.receipt_date}).first()
-            rec_date = rec_date_result[0] if rec_date_result else None
-            
-            if not rec_date:
-                raise HTTPException(status_code=400, detail="Invalid date format. Use dd/mm/yyyy")
-            
-            # Determine initial status
-            initial_status = "Paid" if data.method != "ZALOPAY" else "Pending"
-            
-            # Insert receipt header
-            insert_query = text("""
-                INSERT INTO Receipt(Receipt_date, Method, Status, Customer_id, CV_id)
-                VALUES (:date, :method, :status, :customer_id, :cv_id)
-            """)
-            session.exec(insert_query, params={
-                "date": rec_date,
-                "method": data.method,
-                "status": initial_status,
-                "customer_id": data.customer_id,
-                "cv_id": data.cv_id
-            })
-            
-            result = session.exec(text("SELECT LAST_INSERT_ID()")).first()
-            receipt_id = result[0] if result else None
-            
-            if not receipt_id:
-                raise Exception("Failed to create receipt")
-            
-            # Add all products
-            for product in data.products:
-                session.exec(text("""
-                    CALL create_order_product(:receipt_id, :product_id, :quantity)
-                """), params={
-                    "receipt_id": receipt_id,
-                    "product_id": product.product_id,
-                    "quantity": product.quantity
-                })
-            
-            # Update voucher if used
-            if data.cv_id:
-                session.exec(text("""
-                    UPDATE CustomerVoucher
-                    SET Status = 'Used'
-                    WHERE Customer_id = :customer_id AND CV_id = :cv_id
-                """), params={
-                    "customer_id": data.customer_id,
-                    "cv_id": data.cv_id
-                })
-        
-        session.commit()
+        receipt_id = place_booking(session, data)
+        invalidate_seat_maps({(t.movie_id, t.showtime_id) for t in data.tickets})
         
         # --- ZaloPay Integration ---
         payment_url = None
         if data.method == "ZALOPAY":
-            # Calculate total amount
-            total_amount = 0
-            items = []
-            
-            for t in data.tickets:
-                total_amount += t.price
-                items.append({
-                    "itemid": f"TKT_{t.showtime_id}",
-                    "itemname": f"Ticket {t.seat_number}",
-                    "itemprice": int(t.price),
-                    "itemquantity": 1
-                })
-            
-            for p in data.products:
-                # Fetch product price and name from DB
-                prod_data = session.exec(text("SELECT Name, Price FROM Product WHERE Product_id = :pid"), params={"pid": p.product_id}).first()
-                p_name = prod_data[0] if prod_data else "Product"
-                p_price = float(prod_data[1]) if prod_data else 0
-                
-                total_amount += p_price * p.quantity
-                items.append({
-                    "itemid": f"PRD_{p.product_id}",
-                    "itemname": p_name,
-                    "itemprice": int(p_price), 
-                    "itemquantity": p.quantity
-                })
-            
-            # Apply Voucher Discount to total_amount
-            if data.cv_id:
-                voucher_query = text("""
-                    SELECT v.Discount 
-                    FROM Voucher v 
-                    JOIN CustomerVoucher cv ON v.Voucher_id = cv.Voucher_id 
-                    WHERE cv.CV_id = :cvid
-                """)
-                v_row = session.exec(voucher_query, params={"cvid": data.cv_id}).first()
-                if v_row:
-                    discount_percent = float(v_row[0])
-                    total_amount = total_amount * (1 - discount_percent / 100)
-            
-            # ZaloPay requires amount to be at least 1
-            total_amount = max(1, int(total_amount))
-
-            # Construct URLs for frontend
-            frontend_url = "http://localhost:3000"
-            redirect_url = f"{frontend_url}/bookings/confirmation?bookingId={receipt_id}"
-            callback_url = "http://localhost:8000/receipts/callback" 
-            
-            print(f"[ZaloPay] Creating order for Receipt #{receipt_id}, Amount: {total_amount}")
-            zp_result = create_zalopay_order(
-                total_amount, items, receipt_id, 
-                redirect_url=redirect_url,
-                callback_url=callback_url
-            )
-            
-            print(f"[ZaloPay] Response: {zp_result}")
-            
-            if zp_result.get("returncode") == 1:
-                payment_url = zp_result.get("orderurl")
-            else:
-                error_msg = zp_result.get("returnmessage", "Unknown error")
-                print(f"[ZaloPay] Creation Failed: {error_msg}")
-                raise HTTPException(status_code=400, detail=f"ZaloPay Error: {error_msg}")
+            try:
+                payment_url = create_payment_url(session, data, receipt_id)
+            except Exception:
+                # The Pending receipt is already committed with its seats BOOKED
+                session.rollback()
+                discard_receipt(session, receipt_id)
+                raise
 
         # --- Send ticket confirmation email ---
         if data.method != "ZALOPAY":
@@ -273,11 +335,14 @@ def create_receipt_endpoint(
         detail = str(e)
         if 'ERROR: ' in detail:
             detail = detail.split('ERROR: ')[-1].split("'")[0]
+        if 'ShowtimeSeat does not available' in detail:
+            raise HTTPException(status_code=409, detail={"message": "Seat already taken", "seats": []})
         
         raise HTTPException(status_code=400, detail=detail)
 
 @router.get("/{receipt_id}/status")
 def get_receipt_status(receipt_id: int, session: Session = Depends(get_session)):
+    # Always on the primary (read-your-writes right after payment), never a replica
     query = text("SELECT Status, Method, Customer_id, Receipt_date FROM Receipt WHERE Receipt_id = :rid")
     row = session.exec(query, params={"rid": receipt_id}).first()
     
@@ -311,13 +376,78 @@ def get_receipt_status(receipt_id: int, session: Session = Depends(get_session))
         
         elif zp_status.get("returncode") == 2: # Failed
             print(f"[ZaloPay] Payment FAILED for Receipt #{receipt_id}. Releasing seats...")
-            # Delete the receipt (cascades to tickets in DB)
-            session.exec(text("DELETE FROM Receipt WHERE Receipt_id = :rid"), params={"rid": receipt_id})
+            # Ticket has no FK to Receipt, so release the seats explicitly
+            showtimes = release_receipt(session, receipt_id)
             session.commit()
+            invalidate_seat_maps(showtimes)
             return {"status": "Failed"}
             
     return {"status": status}
 
+def expire_pending_payments(session: Session) -> int:
+    """
+    Release the seats of ZaloPay receipts still Pending after PENDING_PAYMENT_TTL,
+    unless ZaloPay reports them paid or still processing. Receipts are only
+    skipped when ZaloPay cannot be reached. Returns the number of receipts released.
+    """
+    rows = session.exec(text("""
+        SELECT Receipt_id, Receipt_date, Customer_id FROM Receipt
+        WHERE Method = 'ZALOPAY' AND Status = 'Pending'
+          AND Created_at < NOW() - INTERVAL :ttl SECOND
+    """), params={"ttl": PENDING_PAYMENT_TTL}).all()
+    session.commit()
+
+    released = 0
+    for receipt_id, r_date, customer_id in rows:
+        zp_status = query_zalopay_order("{:%y%m%d}_{}".format(r_date, receipt_id))
+        if zp_status.get("returncode", TRANSPORT_ERROR) == TRANSPORT_ERROR:
+            continue   # ZaloPay unreachable: the order may be paid, try again next sweep
+        if zp_status.get("isprocessing"):
+            continue   # the customer is paying right now
+        
+        # Another worker may have settled it meanwhile
+        status = session.exec(text("SELECT Status FROM Receipt WHERE Receipt_id = :rid FOR UPDATE"),
+                              params={"rid": receipt_id}).first()
+        if not status or status[0] != "Pending":
+            session.rollback()
+            continue
+        
+        if zp_status.get("returncode") == 1:
+            session.exec(text("UPDATE Receipt SET Status = 'Paid' WHERE Receipt_id = :rid"), params={"rid": receipt_id})
+            tickets_rows = session.exec(text("SELECT Seat_number as seat_number FROM Ticket WHERE Receipt_id = :rid"),
+                                        params={"rid": receipt_id}).all()
+            session.commit()
+            send_receipt_email_helper(receipt_id, customer_id, session, tickets_rows)
+            continue
+        
+        # Failed, expired, or never created at ZaloPay (e.g. -49 apptransid not found)
+        print(f"[ZaloPay] Receipt #{receipt_id} not paid after {PENDING_PAYMENT_TTL}s "
+              f"(returncode {zp_status.get('returncode')})")
+        discard_receipt(session, receipt_id)
+        released += 1
+    return released
+
+
+_sweeper = None
+
+def start_pending_payment_sweeper(interval: float = PENDING_SWEEP_INTERVAL):
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+
+    def _run():
+        while True:
+            time.sleep(interval)
+            try:
+                with Session(engine) as session:
+                    expire_pending_payments(session)
+            except Exception as e:
+                print(f"[ZaloPay] Pending payment sweep failed: {e}")
+
+    _sweeper = threading.Thread(target=_run, name="pending-payments", daemon=True)
+    _sweeper.start()
+
+
 @router.post("/callback")
 async def zalopay_callback(request: Request, session: Session = Depends(get_session)):
     result = {}
@@ -390,29 +520,9 @@ def delete_receipt(receipt_id: int, session: Session = Depends(get_session)):
             WHERE Customer_id = :cid AND CV_id = :cvid
         """), params={"cid": customer_id, "cvid": cv_id})
     
-    # Get ticket info before deleting to release seats in ShowtimeSeat
-    tickets = session.exec(text("""
-        SELECT Movie_id, Showtime_id, Branch_id, Hall_number, Seat_number 
-        FROM Ticket WHERE Receipt_id = :rid
-    """), params={"rid": receipt_id}).all()
-
-    for t in tickets:
-        session.exec(text("""
-            UPDATE ShowtimeSeat 
-            SET Status = 'AVAILABLE' 
-            WHERE Movie_id = :mid AND Showtime_id = :sid AND Branch_id = :bid 
-              AND Hall_number = :hid AND Seat_number = :sn
-        """), params={
-            "mid": t.Movie_id, "sid": t.Showtime_id, "bid": t.Branch_id,
-            "hid": t.Hall_number, "sn": t.Seat_number
-        })
-
-    # Manually delete dependent records because DB doesn't have ON DELETE CASCADE
-    session.exec(text("DELETE FROM Ticket WHERE Receipt_id = :rid"), params={"rid": receipt_id})
-    session.exec(text("DELETE FROM OrderProduct WHERE Receipt_id = :rid"), params={"rid": receipt_id})
-
-    # Delete receipt
-    session.exec(text("DELETE FROM Receipt WHERE Receipt_id = :rid"), params={"rid": receipt_id})
+    # Release seats in ShowtimeSeat, then delete tickets, products and the receipt
+    showtimes = release_receipt(session, receipt_id)
     session.commit()
+    invalidate_seat_maps(showtimes)
     
     return {"message": "Receipt deleted and seats released"}
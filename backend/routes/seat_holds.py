@@ -0,0 +1,86 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import List
+from sqlmodel import Session
+from sqlalchemy import bindparam, text
+from datetime import datetime, timedelta
+
+from database import get_session
+from seat_holds import hold_store, bump_seat_versions, SEAT_HOLD_TTL
+from seat_map import seat_map_cache
+
+router = APIRouter(
+    prefix="/holds",
+    tags=["seat holds"]
+)
+
+class SeatHoldRequest(BaseModel):
+    customer_id: int
+    movie_id: int
+    showtime_id: int
+    seats: List[str]
+
+class SeatHoldOut(BaseModel):
+    showtime_id: int
+    seats: List[str]
+    expires_at: datetime
+    ttl_seconds: float
+
+
+@router.post("/", response_model=SeatHoldOut)
+def hold_seats(data: SeatHoldRequest, session: Session = Depends(get_session)):
+    """
+    Hold seats for a customer during checkout (all of them or none). Holding
+    again extends the customer's own holds. 409 lists seats that are booked or
+    held by someone else.
+    """
+    if not data.seats:
+        raise HTTPException(status_code=400, detail="No seats to hold")
+    seats = sorted(set(data.seats))
+
+    try:
+        rows = session.exec(text("""
+            SELECT Seat_number FROM ShowtimeSeat
+            WHERE Movie_id = :mid AND Showtime_id = :sid
+              AND Seat_number IN :seats AND Status = 'AVAILABLE'
+        """).bindparams(bindparam("seats", expanding=True)),
+            params={"mid": data.movie_id, "sid": data.showtime_id, "seats": seats}).all()
+        unavailable = sorted(set(seats) - {row[0] for row in rows})
+        if unavailable:
+            raise HTTPException(status_code=409, detail={"message": "Seats not available", "seats": unavailable})
+
+        conflicts = hold_store.acquire(session, data.showtime_id, seats, data.customer_id)
+        if conflicts:
+            session.rollback()
+            raise HTTPException(status_code=409, detail={"message": "Seats held by another customer", "seats": conflicts})
+        bump_seat_versions(session, [data.showtime_id])
+        session.commit()
+    except HTTPException:
+        session.rollback()
+        raise
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    seat_map_cache.invalidate(data.movie_id, data.showtime_id)
+    return {
+        "showtime_id": data.showtime_id,
+        "seats": seats,
+        "expires_at": datetime.now() + timedelta(seconds=SEAT_HOLD_TTL),
+        "ttl_seconds": SEAT_HOLD_TTL,
+    }
+
+
+@router.delete("/")
+def release_seats(data: SeatHoldRequest, session: Session = Depends(get_session)):
+    """Give up the customer's holds on these seats (e.g. checkout cancelled)."""
+    try:
+        hold_store.release(session, data.showtime_id, data.seats, data.customer_id)
+        bump_seat_versions(session, [data.showtime_id])
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    seat_map_cache.invalidate(data.movie_id, data.showtime_id)
+    return {"message": "Seats released"}
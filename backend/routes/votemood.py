@@ -4,6 +4,7 @@ from sqlmodel import Session
 from typing import Optional, List, Dict
 from sqlalchemy import text
 from database import get_session
+from cache import movies_cache
 
 router = APIRouter(
     prefix="/api/votemood",
@@ -50,6 +51,7 @@ def change_mood_vote(
         
         session.exec(stmt, params=params)
         session.commit()
+        movies_cache.invalidate()
         
         return {"message": "Mood vote changed successfully"}
     
@@ -65,15 +67,14 @@ def get_mood_counts(
 ):
     """Get mood vote counts for a specific movie"""
     try:
-        # Query to get mood vote counts for a movie
+        # Mood vote counts are maintained in MovieMoodStats by the Vote triggers
         stmt = text("""
             SELECT 
                 m.Mood_id,
                 m.Name,
-                COUNT(v.Mood_id) as count
+                COALESCE(s.Vote_count, 0) as count
             FROM Mood m
-            LEFT JOIN Vote v ON m.Mood_id = v.Mood_id AND v.Movie_id = :movie_id
-            GROUP BY m.Mood_id, m.Name
+            LEFT JOIN MovieMoodStats s ON m.Mood_id = s.Mood_id AND s.Movie_id = :movie_id
             ORDER BY m.Mood_id
         """)
         
@@ -1,23 +1,45 @@
 import os
 import json
 import hmac
+import random
+import asyncio
 import hashlib
-import urllib.request
-import urllib.parse
+import threading
+import time as clock
 from time import time
 from datetime import datetime
 from dotenv import load_dotenv
+import httpx
+
+from metrics import time_external
 
 load_dotenv()
 
+# ZALOPAY_BASE_URL=http://127.0.0.1:8090 points the client at zalopay_stub.py
+BASE_URL = os.getenv("ZALOPAY_BASE_URL", "https://sandbox.zalopay.com.vn").rstrip("/")
+
 config = {
     "appid": int(os.getenv("APP_ID", "553")),
     "key1": os.getenv("KEY1", ""),
     "key2": os.getenv("KEY2", ""),
-    "endpoint": "https://sandbox.zalopay.com.vn/v001/tpe/createorder"
+    "endpoint": f"{BASE_URL}/v001/tpe/createorder",
+    "query_endpoint": f"{BASE_URL}/v001/tpe/getstatusbyapptransid",
 }
 
-def create_zalopay_order(amount: int, items: list, receipt_id: int, customer_name: str = "Customer", redirect_url: str = None, bank_code: str = "", callback_url: str = None):
+# Keep-alive pool + timeouts (giây), so a slow ZaloPay never pins a worker thread
+ZALOPAY_CONNECT_TIMEOUT = float(os.getenv("ZALOPAY_CONNECT_TIMEOUT", "3"))
+ZALOPAY_READ_TIMEOUT = float(os.getenv("ZALOPAY_READ_TIMEOUT", "10"))
+ZALOPAY_POOL_SIZE = int(os.getenv("ZALOPAY_POOL_SIZE", "20"))
+# Only status queries are retried: a retried create_order could be sent twice
+ZALOPAY_QUERY_RETRIES = int(os.getenv("ZALOPAY_QUERY_RETRIES", "2"))
+ZALOPAY_RETRY_BASE_MS = float(os.getenv("ZALOPAY_RETRY_BASE_MS", "200"))
+
+# returncode of our own when ZaloPay could not be reached (timeout, connection
+# error, 5xx); every other returncode, negative ones included, came from ZaloPay
+TRANSPORT_ERROR = -1
+
+
+def build_order(amount: int, items: list, receipt_id: int, customer_name: str = "Customer", redirect_url: str = None, bank_code: str = "", callback_url: str = None):
     # apptransid must be yyMMdd_xxxx
     app_trans_id = "{:%y%m%d}_{}".format(datetime.today(), receipt_id)
     
@@ -49,15 +71,9 @@ def create_zalopay_order(amount: int, items: list, receipt_id: int, customer_nam
     )
 
     order["mac"] = hmac.new(config['key1'].encode(), data.encode(), hashlib.sha256).hexdigest()
+    return order
 
-    try:
-        response = urllib.request.urlopen(url=config["endpoint"], data=urllib.parse.urlencode(order).encode())
-        result = json.loads(response.read())
-        return result
-    except Exception as e:
-        return {"returncode": -1, "returnmessage": str(e)}
-
-def query_zalopay_order(app_trans_id: str):
+def build_query(app_trans_id: str):
     params = {
         "appid": config["appid"],
         "apptransid": app_trans_id
@@ -66,12 +82,124 @@ def query_zalopay_order(app_trans_id: str):
     # mac = appid|apptransid|key1
     data = "{}|{}|{}".format(params["appid"], params["apptransid"], config["key1"])
     params["mac"] = hmac.new(config['key1'].encode(), data.encode(), hashlib.sha256).hexdigest()
+    return params
 
-    url = "https://sandbox.zalopay.com.vn/v001/tpe/getstatusbyapptransid"
-    
-    try:
-        response = urllib.request.urlopen(url=url, data=urllib.parse.urlencode(params).encode())
-        result = json.loads(response.read())
-        return result
-    except Exception as e:
-        return {"returncode": -1, "returnmessage": str(e)}
\ No newline at end of file
+
+def _retryable(e: Exception) -> bool:
+    # Connection errors / timeouts and 5xx; a 4xx or a ZaloPay returncode is final
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500
+    return isinstance(e, httpx.TransportError)
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, ZALOPAY_RETRY_BASE_MS * (2 ** attempt)) / 1000
+
+def _client_options():
+    return {
+        "timeout": httpx.Timeout(ZALOPAY_READ_TIMEOUT, connect=ZALOPAY_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(max_connections=ZALOPAY_POOL_SIZE, max_keepalive_connections=ZALOPAY_POOL_SIZE),
+    }
+
+
+class ZaloPayClient:
+    """Sync client for the ZaloPay endpoints, sharing one keep-alive pool per worker."""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _http(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**_client_options())
+        return self._client
+
+    def _post(self, url: str, form: dict, operation: str, retries: int = 0) -> dict:
+        for attempt in range(retries + 1):
+            try:
+                with time_external("zalopay", operation):
+                    response = self._http().post(url, data=form)
+                    response.raise_for_status()
+                    return response.json()
+            except Exception as e:
+                if attempt >= retries or not _retryable(e):
+                    raise
+            clock.sleep(_backoff(attempt))
+
+    def create_order(self, order: dict) -> dict:
+        try:
+            return self._post(config["endpoint"], order, "create_order")
+        except Exception as e:
+            return {"returncode": TRANSPORT_ERROR, "returnmessage": str(e)}
+
+    def query_order(self, app_trans_id: str) -> dict:
+        try:
+            return self._post(config["query_endpoint"], build_query(app_trans_id), "query_order", ZALOPAY_QUERY_RETRIES)
+        except Exception as e:
+            return {"returncode": TRANSPORT_ERROR, "returnmessage": str(e)}
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class AsyncZaloPayClient:
+    """Same as ZaloPayClient for async routes; the pool is created on first use in the event loop."""
+
+    def __init__(self):
+        self._client = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(**_client_options())
+        return self._client
+
+    async def _post(self, url: str, form: dict, operation: str, retries: int = 0) -> dict:
+        for attempt in range(retries + 1):
+            try:
+                with time_external("zalopay", operation):
+                    response = await self._http().post(url, data=form)
+                    response.raise_for_status()
+                    return response.json()
+            except Exception as e:
+                if attempt >= retries or not _retryable(e):
+                    raise
+            await asyncio.sleep(_backoff(attempt))
+
+    async def create_order(self, order: dict) -> dict:
+        try:
+            return await self._post(config["endpoint"], order, "create_order")
+        except Exception as e:
+            return {"returncode": TRANSPORT_ERROR, "returnmessage": str(e)}
+
+    async def query_order(self, app_trans_id: str) -> dict:
+        try:
+            return await self._post(config["query_endpoint"], build_query(app_trans_id), "query_order", ZALOPAY_QUERY_RETRIES)
+        except Exception as e:
+            return {"returncode": TRANSPORT_ERROR, "returnmessage": str(e)}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+zalopay_client = ZaloPayClient()
+async_zalopay_client = AsyncZaloPayClient()
+
+
+def create_zalopay_order(amount: int, items: list, receipt_id: int, customer_name: str = "Customer", redirect_url: str = None, bank_code: str = "", callback_url: str = None):
+    order = build_order(amount, items, receipt_id, customer_name, redirect_url, bank_code, callback_url)
+    return zalopay_client.create_order(order)
+
+def query_zalopay_order(app_trans_id: str):
+    return zalopay_client.query_order(app_trans_id)
+
+async def create_zalopay_order_async(amount: int, items: list, receipt_id: int, customer_name: str = "Customer", redirect_url: str = None, bank_code: str = "", callback_url: str = None):
+    order = build_order(amount, items, receipt_id, customer_name, redirect_url, bank_code, callback_url)
+    return await async_zalopay_client.create_order(order)
+
+async def query_zalopay_order_async(app_trans_id: str):
+    return await async_zalopay_client.query_order(app_trans_id)
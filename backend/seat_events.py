@@ -0,0 +1,149 @@
+"""
+Seat availability push over Server-Sent Events.
+
+Watchers of one showtime share a single SeatChannel per worker: one task
+refreshes the seat map through seat_map_cache and fans the same encoded
+event out to every subscriber queue. The task wakes up right away when this
+worker invalidates the showtime (booking, release, payment failure) and at
+least every SEAT_STREAM_POLL_INTERVAL seconds to pick up writes committed by
+other workers, so thousands of watchers cost one query per interval.
+
+Event ids are seat-map versions; a client reconnecting with Last-Event-ID
+only gets the seats changed since then.
+"""
+import asyncio
+import json
+import os
+
+from database import async_session_factory
+from seat_map import seat_map_cache
+
+SEAT_STREAM_POLL_INTERVAL = float(os.getenv("SEAT_STREAM_POLL_INTERVAL", "2"))   # giây
+SEAT_STREAM_HEARTBEAT = float(os.getenv("SEAT_STREAM_HEARTBEAT", "15"))
+SEAT_STREAM_QUEUE_SIZE = 64
+
+
+def format_event(kind: str, payload: dict) -> str:
+    return f"id: {payload['version']}\nevent: {kind}\ndata: {json.dumps(payload)}\n\n"
+
+
+class Subscriber:
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=SEAT_STREAM_QUEUE_SIZE)
+        self.resync = False            # fell behind: send a full snapshot next
+
+
+class SeatChannel:
+    def __init__(self, hub, movie_id: int, showtime_id: int):
+        self.hub = hub
+        self.movie_id = movie_id
+        self.showtime_id = showtime_id
+        self.subscribers = set()
+        self.version = None
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def publish(self, event: str):
+        for sub in self.subscribers:
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog, it gets a fresh snapshot instead
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.resync = True
+                sub.queue.put_nowait(None)
+
+    async def snapshot(self, since: str = None):
+        async with async_session_factory() as session:
+            return await seat_map_cache.get(session, self.movie_id, self.showtime_id, since)
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                try:
+                    await asyncio.wait_for(self.changed.wait(), SEAT_STREAM_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self.changed.clear()
+                try:
+                    delta = await self.snapshot(self.version)
+                except Exception as e:
+                    print(f"[SeatStream] Refresh failed for showtime {self.showtime_id}: {e}")
+                    continue
+                if delta["version"] == self.version:
+                    continue
+                self.version = delta["version"]
+                self.publish(format_event("delta" if not delta["full"] else "snapshot", delta))
+        finally:
+            self.hub.drop(self)
+
+
+class SeatHub:
+    def __init__(self):
+        self.channels = {}             # (movie_id, showtime_id) -> SeatChannel
+        self.loop = None
+
+    def _channel(self, movie_id: int, showtime_id: int) -> SeatChannel:
+        key = (movie_id, showtime_id)
+        channel = self.channels.get(key)
+        if channel is None:
+            channel = self.channels[key] = SeatChannel(self, movie_id, showtime_id)
+        return channel
+
+    def drop(self, channel: SeatChannel):
+        key = (channel.movie_id, channel.showtime_id)
+        if self.channels.get(key) is channel and not channel.subscribers:
+            del self.channels[key]
+
+    def subscribe(self, movie_id: int, showtime_id: int):
+        self.loop = asyncio.get_running_loop()
+        channel = self._channel(movie_id, showtime_id)
+        sub = Subscriber()
+        channel.subscribers.add(sub)
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(channel.run())
+        return channel, sub
+
+    def unsubscribe(self, channel: SeatChannel, sub: Subscriber):
+        channel.subscribers.discard(sub)
+        if not channel.subscribers:
+            channel.changed.set()      # let the task see it has no watchers and exit
+
+    def notify(self, movie_id: int, showtime_id: int):
+        """Wake the channel of a showtime; may be called from any thread."""
+        channel = self.channels.get((movie_id, showtime_id))
+        if channel is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(channel.changed.set)
+
+    async def stream(self, movie_id: int, showtime_id: int, last_event_id: str = None):
+        """SSE body: a snapshot (or the delta since Last-Event-ID), then deltas and heartbeats."""
+        channel, sub = self.subscribe(movie_id, showtime_id)
+        try:
+            first = await channel.snapshot(last_event_id)
+            if channel.version is None:
+                channel.version = first["version"]
+            yield format_event("snapshot" if first["full"] else "delta", first)
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), SEAT_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if sub.resync:
+                    sub.resync = False
+                    yield format_event("snapshot", await channel.snapshot())
+                elif event is not None:
+                    yield event
+        finally:
+            self.unsubscribe(channel, sub)
+
+    def stats(self):
+        return {
+            "channels": len(self.channels),
+            "watchers": sum(len(c.subscribers) for c in self.channels.values()),
+        }
+
+
+seat_hub = SeatHub()
+seat_map_cache.on_invalidate.append(seat_hub.notify)
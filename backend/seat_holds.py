@@ -0,0 +1,185 @@
+"""
+Temporary seat holds (leases) during checkout.
+
+A customer holds seats for SEAT_HOLD_TTL seconds while paying; other customers
+see them as HELD in the seat map and cannot hold or book them. An expired hold
+no longer blocks anyone, and the sweeper (start_hold_sweeper) deletes it
+within SEAT_HOLD_SWEEP_INTERVAL seconds; until then the seat map still shows
+it as HELD.
+
+Every change of the holds a seat map shows (taken, released, swept) bumps the
+showtime's shared seat-map version (bump_seat_versions) in the same
+transaction, so seat_map.py in every worker notices it without writing.
+
+SEAT_HOLD_BACKEND:
+    memory  holds live in this worker process (single worker / dev, default)
+    mysql   holds live in the SeatHold table, shared by all workers
+
+Both backends take the caller's session: the mysql backend writes in the same
+transaction, so a hold taken while creating a receipt commits or rolls back
+with it.
+"""
+import os
+import threading
+import time
+from sqlalchemy import bindparam, text
+from sqlmodel import Session
+
+SEAT_HOLD_TTL = float(os.getenv("SEAT_HOLD_TTL", "300"))       # giây
+SEAT_HOLD_BACKEND = os.getenv("SEAT_HOLD_BACKEND", "memory")
+SEAT_HOLD_SWEEP_INTERVAL = float(os.getenv("SEAT_HOLD_SWEEP_INTERVAL", "5"))   # giây
+
+
+def bump_seat_versions(session, showtime_ids):
+    """Bump the shared seat-map version of these showtimes (no commit)."""
+    showtime_ids = sorted(set(showtime_ids))   # counter rows locked in key order
+    if not showtime_ids:
+        return
+    session.exec(text("""
+        INSERT INTO ShowtimeSeatCounter (Showtime_id, Slot, Seat_version)
+        VALUES """ + ", ".join(f"(:sid{i}, 0, 1)" for i in range(len(showtime_ids))) + """
+        ON DUPLICATE KEY UPDATE Seat_version = Seat_version + 1
+    """), params={f"sid{i}": sid for i, sid in enumerate(showtime_ids)})
+
+
+class MemoryHoldStore:
+    def __init__(self):
+        self._holds = {}               # showtime_id -> {seat_number: (holder, expires_at)}
+        self._lock = threading.Lock()
+
+    def acquire(self, session, showtime_id: int, seats, holder: int, ttl: float = SEAT_HOLD_TTL):
+        """Hold (or extend) every seat for `holder`, or none of them; returns the seats held by others."""
+        now = time.monotonic()
+        with self._lock:
+            held = self._holds.setdefault(showtime_id, {})
+            conflicts = [n for n in seats if n in held and held[n][0] != holder and held[n][1] > now]
+            if conflicts:
+                return conflicts
+            for seat_number in seats:
+                held[seat_number] = (holder, now + ttl)
+            return []
+
+    def release(self, session, showtime_id: int, seats, holder: int):
+        with self._lock:
+            held = self._holds.get(showtime_id, {})
+            for seat_number in seats:
+                if seat_number in held and held[seat_number][0] == holder:
+                    del held[seat_number]
+
+    async def held(self, session, showtime_id: int):
+        """{seat_number: holder} of the holds of a showtime not swept yet."""
+        with self._lock:
+            return {n: holder for n, (holder, _) in self._holds.get(showtime_id, {}).items()}
+
+    def expire(self, session):
+        """Drop expired holds; returns the showtimes that had some."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for showtime_id, held in list(self._holds.items()):
+                stale = [n for n, (_, expires_at) in held.items() if expires_at <= now]
+                for seat_number in stale:
+                    del held[seat_number]
+                if stale:
+                    expired.append(showtime_id)
+                if not held:
+                    del self._holds[showtime_id]
+        return expired
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {"backend": "memory", "holds": sum(
+                1 for held in self._holds.values() for _, expires_at in held.values() if expires_at > now
+            )}
+
+
+class MySQLHoldStore:
+    def acquire(self, session, showtime_id: int, seats, holder: int, ttl: float = SEAT_HOLD_TTL):
+        if not seats:
+            return []
+        seats = sorted(seats)          # SeatHold rows locked in key order
+        # Take over expired holds and extend our own; leave other customers' live holds alone.
+        # MySQL applies the assignments left to right, so Expires_at sees the new Holder_id.
+        # On conflicts the caller rolls back, so either every seat is held or none.
+        session.exec(text("""
+            INSERT INTO SeatHold (Showtime_id, Seat_number, Holder_id, Expires_at)
+            VALUES """ + ", ".join(f"(:sid, :s{i}, :holder, NOW() + INTERVAL :ttl SECOND)" for i in range(len(seats))) + """
+            ON DUPLICATE KEY UPDATE
+                Holder_id = IF(Holder_id = VALUES(Holder_id) OR Expires_at <= NOW(), VALUES(Holder_id), Holder_id),
+                Expires_at = IF(Holder_id = VALUES(Holder_id), VALUES(Expires_at), Expires_at)
+        """), params={"sid": showtime_id, "holder": holder, "ttl": int(ttl),
+                      **{f"s{i}": n for i, n in enumerate(seats)}})
+        rows = session.exec(text("""
+            SELECT Seat_number FROM SeatHold
+            WHERE Showtime_id = :sid AND Seat_number IN :seats AND Holder_id <> :holder
+        """).bindparams(bindparam("seats", expanding=True)),
+            params={"sid": showtime_id, "seats": list(seats), "holder": holder}).all()
+        return [row[0] for row in rows]
+
+    def release(self, session, showtime_id: int, seats, holder: int):
+        if not seats:
+            return
+        session.exec(text("""
+            DELETE FROM SeatHold
+            WHERE Showtime_id = :sid AND Seat_number IN :seats AND Holder_id = :holder
+        """).bindparams(bindparam("seats", expanding=True)),
+            params={"sid": showtime_id, "seats": list(seats), "holder": holder})
+
+    async def held(self, session, showtime_id: int):
+        result = await session.execute(text("""
+            SELECT Seat_number, Holder_id FROM SeatHold WHERE Showtime_id = :sid
+        """), {"sid": showtime_id})
+        return {row[0]: row[1] for row in result.all()}
+
+    def expire(self, session):
+        cutoff = session.exec(text("SELECT NOW()")).first()[0]
+        showtime_ids = [row[0] for row in session.exec(text("""
+            SELECT DISTINCT Showtime_id FROM SeatHold WHERE Expires_at <= :cutoff ORDER BY Showtime_id
+        """), params={"cutoff": cutoff}).all()]
+        if showtime_ids:
+            # Holds renewed in between (Expires_at moved past cutoff) are kept
+            session.exec(text("""
+                DELETE FROM SeatHold WHERE Showtime_id IN :sids AND Expires_at <= :cutoff
+            """).bindparams(bindparam("sids", expanding=True)),
+                params={"sids": showtime_ids, "cutoff": cutoff})
+        return showtime_ids
+
+    def stats(self):
+        return {"backend": "mysql"}
+
+
+BACKENDS = {
+    "memory": MemoryHoldStore,
+    "mysql": MySQLHoldStore,
+}
+
+hold_store = BACKENDS[SEAT_HOLD_BACKEND]()
+
+
+def expire_holds(session):
+    """Sweep expired holds and bump the versions of their showtimes; returns those showtimes."""
+    showtime_ids = hold_store.expire(session)
+    bump_seat_versions(session, showtime_ids)
+    session.commit()
+    return showtime_ids
+
+
+_sweeper = None
+
+def start_hold_sweeper(engine, interval: float = SEAT_HOLD_SWEEP_INTERVAL):
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+
+    def _run():
+        while True:
+            time.sleep(interval)
+            try:
+                with Session(engine) as session:
+                    expire_holds(session)
+            except Exception as e:
+                print(f"[Holds] Hold sweep failed: {e}")
+
+    _sweeper = threading.Thread(target=_run, name="seat-hold-sweeper", daemon=True)
+    _sweeper.start()
@@ -0,0 +1,276 @@
+"""
+Per-showtime seat-map cache with versioned deltas.
+
+Each worker keeps the last GetShowtimeSeats snapshot of a showtime. The
+version of a showtime is shared by all workers: SUM(Seat_version) of its
+ShowtimeSeatCounter rows, bumped in the same transaction as every seat
+change (triggers, create_receipt_bulk, release_receipt_seats). A cached map
+is served for SEAT_MAP_VERSION_CHECK_INTERVAL seconds, then the version is
+checked (one primary-key read) and the map reloaded only if it moved, so a
+booking in any worker shows up everywhere within that interval. The full
+map is reloaded at least every SEAT_MAP_CACHE_TTL seconds, and right away
+after invalidate().
+
+Every seat remembers the version at which this worker saw its status change,
+so a client that sends its last version, issued by any worker, gets back only
+the seats changed since (older than this worker's first snapshot: full map).
+
+Seats under a checkout hold (seat_holds) are reported as HELD. Holds are not
+in ShowtimeSeat: seat_holds bumps the version itself where holds are taken,
+released and swept. Reads never write; a change found without a new version
+(e.g. a seat type edit) makes every client of the current version reload
+the full map.
+
+A full map can also be returned in a compact form (encode_bitmap): statuses
+as a row-major nibble bitmap over Hall.Row_count x Hall.Col_count, seat
+types as run-length pairs over a type dictionary.
+"""
+import asyncio
+import base64
+import os
+import re
+import threading
+import time
+from sqlalchemy import text
+
+from seat_holds import hold_store
+
+SEAT_MAP_CACHE_TTL = float(os.getenv("SEAT_MAP_CACHE_TTL", "2"))     # giây; tải lại toàn bộ sau TTL
+SEAT_MAP_CACHE_SIZE = int(os.getenv("SEAT_MAP_CACHE_SIZE", "2000"))   # số suất chiếu tối đa
+SEAT_MAP_VERSION_CHECK_INTERVAL = float(os.getenv("SEAT_MAP_VERSION_CHECK_INTERVAL", "0.25"))  # giây
+
+# Index in the bitmap = status code; 0 = no seat at that position
+STATUS_CODES = ["NONE", "AVAILABLE", "BOOKED", "BLOCKED", "HELD"]
+COMPACT_MEDIA_TYPE = "application/vnd.cinema.seatmap+json"    # Accept header asking for the compact form
+SEAT_POSITION = re.compile(r"^([A-Z])(\d+)$")      # A1, B12: hàng chữ cái, cột số (như trg_generate_standard_seats)
+
+
+class SeatMapEntry:
+    def __init__(self):
+        self.version = 0               # shared version of the snapshot
+        self.base_version = 0          # version of the first snapshot: older clients get the full map
+        self.seats = {}                # Seat_number -> {"Seat_number", "Seat_type", "Status"}
+        self.changed_at = {}           # Seat_number -> version of its last change
+        self.expires_at = 0.0
+        self.checked_at = 0.0          # last time the shared version was compared
+        self.stale = True
+        self.lock = asyncio.Lock()
+        self.rows = None               # Hall.Row_count / Col_count, loaded once
+        self.cols = None
+        self.bitmap = None             # (version, encoded full map)
+
+
+class SeatMapCache:
+    def __init__(self, ttl: float = SEAT_MAP_CACHE_TTL, maxsize: int = SEAT_MAP_CACHE_SIZE,
+                 check_interval: float = SEAT_MAP_VERSION_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        self._entries = {}             # (movie_id, showtime_id) -> SeatMapEntry
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.version_checks = 0
+        self.unversioned = 0           # reloads that found changes without a new version
+        self.invalidations = 0
+        self.on_invalidate = []        # callbacks(movie_id, showtime_id), e.g. the SSE hub
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.maxsize:
+                    # Drop the showtime that expired first
+                    oldest = min(self._entries, key=lambda k: self._entries[k].expires_at)
+                    del self._entries[oldest]
+                entry = self._entries[key] = SeatMapEntry()
+            return entry
+
+    def invalidate(self, movie_id: int, showtime_id: int):
+        """Mark a showtime stale after a commit that changed its seats (safe from sync threads)."""
+        with self._lock:
+            entry = self._entries.get((movie_id, showtime_id))
+            self.invalidations += 1
+        if entry is not None:
+            entry.stale = True
+        for callback in self.on_invalidate:
+            callback(movie_id, showtime_id)
+
+    async def _db_version(self, session, showtime_id: int) -> int:
+        row = (await session.execute(text("""
+            SELECT COALESCE(SUM(Seat_version), 0) FROM ShowtimeSeatCounter WHERE Showtime_id = :sid
+        """), {"sid": showtime_id})).first()
+        return int(row[0])
+
+    async def _snapshot(self, session, entry: SeatMapEntry, movie_id: int, showtime_id: int):
+        """(version before, version after, seats with holds applied), read in one transaction."""
+        before = await self._db_version(session, showtime_id)
+        result = await session.execute(
+            text("CALL GetShowtimeSeats(:mid, :sid)"), {"mid": movie_id, "sid": showtime_id}
+        )
+        rows = result.mappings().all()
+        if entry.rows is None:
+            hall = (await session.execute(text("""
+                SELECT h.Row_count, h.Col_count
+                FROM Showtime s
+                JOIN Hall h ON h.Branch_id = s.Branch_id AND h.Hall_number = s.Hall_number
+                WHERE s.Showtime_id = :sid
+            """), {"sid": showtime_id})).first()
+            entry.rows, entry.cols = (hall[0], hall[1]) if hall else (0, 0)
+        held = await hold_store.held(session, showtime_id)
+        after = await self._db_version(session, showtime_id)
+        await session.commit()
+
+        seats = {row["Seat_number"]: dict(row) for row in rows}
+        for seat_number in held:
+            # Available seats under a live checkout hold show as HELD
+            if seat_number in seats and seats[seat_number]["Status"] == "AVAILABLE":
+                seats[seat_number]["Status"] = "HELD"
+        return before, after, seats
+
+    async def _load(self, session, entry: SeatMapEntry, movie_id: int, showtime_id: int):
+        for _ in range(3):
+            # Under REPEATABLE READ both versions come from the same snapshot;
+            # under READ COMMITTED a write landed in between: read again
+            before, after, seats = await self._snapshot(session, entry, movie_id, showtime_id)
+            if before == after:
+                break
+        changed = [n for n, seat in seats.items() if entry.seats.get(n) != seat]
+        changed += [n for n in entry.seats if n not in seats]
+        unversioned = bool(changed) and bool(entry.seats) and before <= entry.version
+        self._apply(entry, seats, changed, before)
+        if unversioned:
+            # Changed without a version bump: no delta can describe it, so
+            # clients of this version (or older) get the full map
+            entry.base_version = before + 1
+            self.unversioned += 1
+        # Versions still moving: check again on the next request
+        entry.stale = before != after
+        self.loads += 1
+
+    def _apply(self, entry: SeatMapEntry, seats, changed, version: int):
+        if not entry.seats:
+            entry.base_version = version
+        for seat_number in changed:
+            entry.changed_at[seat_number] = version
+        entry.version = version
+        entry.seats = seats
+        now = time.monotonic()
+        entry.expires_at = now + self.ttl
+        entry.checked_at = now
+        entry.stale = False
+
+    async def _fresh(self, session, movie_id: int, showtime_id: int) -> SeatMapEntry:
+        entry = self._entry((movie_id, showtime_id))
+        now = time.monotonic()
+        if not entry.stale and entry.expires_at > now and now - entry.checked_at < self.check_interval:
+            self.hits += 1
+            return entry
+        async with entry.lock:
+            # Another request may have reloaded / checked while we waited
+            now = time.monotonic()
+            if not entry.stale and entry.expires_at > now:
+                if now - entry.checked_at < self.check_interval:
+                    self.hits += 1
+                    return entry
+                version = await self._db_version(session, showtime_id)
+                await session.commit()
+                self.version_checks += 1
+                if version == entry.version:
+                    entry.checked_at = time.monotonic()
+                    self.hits += 1
+                    return entry
+            await self._load(session, entry, movie_id, showtime_id)
+        return entry
+
+    async def get(self, session, movie_id: int, showtime_id: int, since: str = None, compact: bool = False):
+        """
+        {"version", "full", "seats"}: every seat, or with `since` only the seats
+        whose status changed after that version (removed seats come back with Status None).
+        With `compact`, a full map comes as {"bitmap": ...} instead of a seat list.
+        """
+        entry = await self._fresh(session, movie_id, showtime_id)
+        version = str(entry.version)
+        since_n = parse_version(since)
+        if since_n is not None and entry.base_version <= since_n <= entry.version:
+            seats = [
+                entry.seats.get(n, {"Seat_number": n, "Seat_type": None, "Status": None})
+                for n, v in entry.changed_at.items() if v > since_n
+            ]
+            return {"version": version, "full": False, "seats": seats}
+        if compact:
+            cached = entry.bitmap
+            if cached is None or cached[0] != entry.version:
+                cached = entry.bitmap = (entry.version, encode_bitmap(entry.seats.values(), entry.rows, entry.cols))
+            return {"version": version, "full": True, "seats": [], "bitmap": cached[1]}
+        return {"version": version, "full": True, "seats": list(entry.seats.values())}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "showtimes": len(self._entries),
+                "ttl": self.ttl,
+                "version_check_interval": self.check_interval,
+                "loads": self.loads,
+                "hits": self.hits,
+                "version_checks": self.version_checks,
+                "unversioned_changes": self.unversioned,
+                "invalidations": self.invalidations,
+            }
+
+
+def encode_bitmap(seats, rows: int, cols: int):
+    """
+    Compact seat map:
+      statuses   base64 of one nibble per position, row-major, high nibble first;
+                 value = index in status_codes (0 = no seat)
+      type_runs  [[index in seat_types or -1 for no seat, run length], ...] row-major
+      extra      seats whose number does not fit the Row_count x Col_count grid
+    """
+    codes = bytearray(rows * cols)
+    types = [-1] * (rows * cols)
+    seat_types = []
+    extra = []
+    for seat in seats:
+        match = SEAT_POSITION.match(seat["Seat_number"])
+        row = ord(match.group(1)) - ord("A") if match else -1
+        col = int(match.group(2)) - 1 if match else -1
+        if not (0 <= row < rows and 0 <= col < cols) or seat["Status"] not in STATUS_CODES:
+            extra.append(seat)
+            continue
+        pos = row * cols + col
+        codes[pos] = STATUS_CODES.index(seat["Status"])
+        if seat["Seat_type"] not in seat_types:
+            seat_types.append(seat["Seat_type"])
+        types[pos] = seat_types.index(seat["Seat_type"])
+
+    if len(codes) % 2:
+        codes.append(0)
+    packed = bytes((codes[i] << 4) | codes[i + 1] for i in range(0, len(codes), 2))
+
+    type_runs = []
+    for t in types:
+        if type_runs and type_runs[-1][0] == t:
+            type_runs[-1][1] += 1
+        else:
+            type_runs.append([t, 1])
+
+    return {
+        "rows": rows,
+        "cols": cols,
+        "status_codes": STATUS_CODES,
+        "statuses": base64.b64encode(packed).decode("ascii"),
+        "seat_types": seat_types,
+        "type_runs": type_runs,
+        "extra": extra,
+    }
+
+
+def parse_version(version: str):
+    """Numeric seat-map version sent by a client (from any worker), else None."""
+    if not version or not version.isdigit():
+        return None
+    return int(version)
+
+
+seat_map_cache = SeatMapCache()
@@ -0,0 +1,96 @@
+"""
+Structured SQL logging (replaces echo=True).
+
+SQL_LOG_MODE:
+    off     nothing is logged (default)
+    sample  1 in SQL_LOG_SAMPLE_RATE statements
+    slow    statements slower than SQL_LOG_SLOW_MS
+    all     every statement
+
+Each record is one JSON line with the statement fingerprint, duration,
+row count and the route that issued it.
+"""
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+
+SQL_LOG_MODE = os.getenv("SQL_LOG_MODE", "off")
+SQL_LOG_SAMPLE_RATE = max(1, int(os.getenv("SQL_LOG_SAMPLE_RATE", "100")))
+SQL_LOG_SLOW_MS = float(os.getenv("SQL_LOG_SLOW_MS", "200"))
+SQL_LOG_FILE = os.getenv("SQL_LOG_FILE")          # mặc định: stdout
+
+# ASGI scope of the request being served, set by the middleware in main.py
+current_request = ContextVar("current_request", default=None)
+
+logger = logging.getLogger("sql")
+logger.propagate = False
+if not logger.handlers:
+    handler = logging.FileHandler(SQL_LOG_FILE) if SQL_LOG_FILE else logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+_counter = itertools.count()
+_literal = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_spaces = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and replace literals with ? so equal queries share a fingerprint."""
+    return _spaces.sub(" ", _literal.sub("?", statement)).strip()
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode("utf-8")).hexdigest()[:16]
+
+
+def current_route():
+    """(method, route template) of the current request, or (None, None) outside a request."""
+    scope = current_request.get()
+    if scope is None:
+        return None, None
+    route = scope.get("route")
+    return scope.get("method"), getattr(route, "path", scope.get("path"))
+
+
+def _should_log(duration_ms: float) -> bool:
+    if SQL_LOG_MODE == "all":
+        return True
+    if SQL_LOG_MODE == "slow":
+        return duration_ms >= SQL_LOG_SLOW_MS
+    if SQL_LOG_MODE == "sample":
+        return next(_counter) % SQL_LOG_SAMPLE_RATE == 0
+    return False
+
+
+def install_sql_logging(engine):
+    if SQL_LOG_MODE == "off":
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if not _should_log(duration_ms):
+            return
+        method, route = current_route()
+        logger.info(json.dumps({
+            "ts": time.time(),
+            "fingerprint": fingerprint(statement),
+            "statement": normalize_statement(statement)[:300],
+            "duration_ms": round(duration_ms, 3),
+            "rows": cursor.rowcount,
+            "method": method,
+            "route": route,
+            "pid": os.getpid(),
+        }))
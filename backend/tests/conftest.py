@@ -0,0 +1,18 @@
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tests import the backend modules the way uvicorn does (from backend/)
+sys.path.insert(0, BACKEND)
+
+# database.py builds its engine URLs at import time; without a .env, unit
+# tests still import it (they never connect) and the database tests skip
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND, ".env"))
+except ImportError:
+    pass
+for name, value in {"DB_USER": "test", "DB_PASS": "test", "DB_HOST": "127.0.0.1",
+                    "DB_PORT": "3306", "DB_NAME": "db_assignment2"}.items():
+    os.environ.setdefault(name, value)
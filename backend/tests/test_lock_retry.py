@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlmodel")
+pytest.importorskip("prometheus_client")
+
+from prometheus_client import REGISTRY
+from sqlalchemy import exc
+
+import database
+from database import DB_LOCK_RETRY_BASE_MS, lock_conflict_reason, retry_on_lock_conflict
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def mysql_error(code: int):
+    return exc.OperationalError("UPDATE ShowtimeSeat ...", {}, Exception(code, "lock conflict"))
+
+
+def failing(*codes, result="receipt"):
+    """fn() raising a MySQL error for each code in turn, then returning result."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(codes):
+            raise mysql_error(codes[len(calls) - 1])
+        return result
+    return fn, calls
+
+
+def retries(reason: str) -> float:
+    return REGISTRY.get_sample_value("db_lock_retries_total", {"reason": reason}) or 0.0
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(database.time, "sleep", slept.append)
+    monkeypatch.setattr(database.random, "uniform", lambda low, high: high)   # top of the jitter range
+    return slept
+
+
+def test_lock_conflict_reason():
+    assert lock_conflict_reason(mysql_error(1213)) == "deadlock"
+    assert lock_conflict_reason(mysql_error(1205)) == "lock_wait_timeout"
+    assert lock_conflict_reason(mysql_error(1062)) is None
+
+
+def test_retries_deadlock_and_lock_wait_with_backoff(sleeps):
+    session = FakeSession()
+    fn, calls = failing(1213, 1205)
+    before = retries("deadlock"), retries("lock_wait_timeout")
+
+    assert retry_on_lock_conflict(session, fn, retries=3) == "receipt"
+    assert len(calls) == 3
+    assert session.rollbacks == 2
+    # Exponential: the jitter range doubles with every attempt
+    assert sleeps == [DB_LOCK_RETRY_BASE_MS / 1000, 2 * DB_LOCK_RETRY_BASE_MS / 1000]
+    assert (retries("deadlock"), retries("lock_wait_timeout")) == (before[0] + 1, before[1] + 1)
+
+
+def test_gives_up_after_retries(sleeps):
+    session = FakeSession()
+    fn, calls = failing(1213, 1213, 1213)
+    with pytest.raises(exc.OperationalError):
+        retry_on_lock_conflict(session, fn, retries=2)
+    assert len(calls) == 3
+    assert session.rollbacks == 3
+    assert len(sleeps) == 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    session = FakeSession()
+    fn, calls = failing(1062)
+    with pytest.raises(exc.OperationalError):
+        retry_on_lock_conflict(session, fn, retries=3)
+    assert len(calls) == 1
+    assert session.rollbacks == 1
+    assert sleeps == []
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlmodel")
+
+import seat_holds
+from seat_holds import MemoryHoldStore
+
+SHOWTIME = 7
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(seat_holds.time, "monotonic", lambda: now[0])
+    return now
+
+
+def held(store, showtime_id=SHOWTIME):
+    return asyncio.run(store.held(None, showtime_id))
+
+
+def test_conflict_holds_nothing(clock):
+    store = MemoryHoldStore()
+    assert store.acquire(None, SHOWTIME, ["A1", "A2"], holder=1, ttl=60) == []
+    assert store.acquire(None, SHOWTIME, ["A2", "A3"], holder=2, ttl=60) == ["A2"]
+    # All or nothing: A3 was not held for customer 2
+    assert held(store) == {"A1": 1, "A2": 1}
+
+
+def test_holder_extends_own_hold(clock):
+    store = MemoryHoldStore()
+    store.acquire(None, SHOWTIME, ["A1"], holder=1, ttl=60)
+    clock[0] += 50
+    assert store.acquire(None, SHOWTIME, ["A1", "A2"], holder=1, ttl=60) == []
+    clock[0] += 50                     # past the first TTL, within the extended one
+    assert store.acquire(None, SHOWTIME, ["A1"], holder=2, ttl=60) == ["A1"]
+
+
+def test_expired_hold_can_be_taken_over(clock):
+    store = MemoryHoldStore()
+    store.acquire(None, SHOWTIME, ["A1"], holder=1, ttl=60)
+    clock[0] += 60
+    assert store.acquire(None, SHOWTIME, ["A1"], holder=2, ttl=60) == []
+    assert held(store) == {"A1": 2}
+
+
+def test_expire_sweeps_expired_holds(clock):
+    store = MemoryHoldStore()
+    store.acquire(None, SHOWTIME, ["A1"], holder=1, ttl=60)
+    store.acquire(None, SHOWTIME + 1, ["B1"], holder=2, ttl=120)
+    clock[0] += 60
+
+    # Shown until swept, so the seat map only changes with a version bump
+    assert held(store) == {"A1": 1}
+    assert store.stats()["holds"] == 1
+
+    assert store.expire(None) == [SHOWTIME]
+    assert held(store) == {}
+    assert held(store, SHOWTIME + 1) == {"B1": 2}
+    assert store.expire(None) == []
+
+
+def test_release_only_drops_own_holds(clock):
+    store = MemoryHoldStore()
+    store.acquire(None, SHOWTIME, ["A1"], holder=1, ttl=60)
+    store.acquire(None, SHOWTIME, ["A2"], holder=2, ttl=60)
+    store.release(None, SHOWTIME, ["A1", "A2", "A9"], holder=1)
+    assert held(store) == {"A2": 2}
@@ -0,0 +1,82 @@
+"""
+Query ceilings of the hot read endpoints (query_stats.assert_max_queries).
+
+A ceiling does not depend on the catalog size: a query added inside a loop
+over movies or seats breaks it. Needs the app's dependencies and the MySQL
+database from .env loaded with the sample data; skipped otherwise.
+"""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")            # TestClient
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from query_stats import assert_max_queries
+
+
+@pytest.fixture(scope="module")
+def client():
+    try:
+        from main import app
+        from database import engine
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"test database not available: {e}")
+    # Not entered as a context manager: the startup hooks would start the
+    # sweepers, whose queries count_queries() would pick up too
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def showtime(client):
+    from database import engine
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT Movie_id, Showtime_id FROM ShowtimeSeat LIMIT 1")).first()
+    if row is None:
+        pytest.skip("no showtime in the test database")
+    return row[0], row[1]
+
+
+@pytest.fixture(autouse=True)
+def cold_caches(client):
+    from cache import CACHES
+    for cache in CACHES.values():
+        cache.invalidate()
+        cache.checked_at = 0.0       # the shared version is checked on the next read
+
+
+def test_movie_list(client):
+    # Shared cache version, movies, then ratings and top moods of all of them at once
+    with assert_max_queries(4):
+        response = client.get("/movies/")
+    assert response.status_code == 200
+
+    with assert_max_queries(1):
+        assert client.get("/movies/").json() == response.json()
+
+
+def test_movie_detail(client, showtime):
+    movie_id, _ = showtime
+    # Movie, rating, moods, GetMovieShowtimes, GetMovieReviews
+    with assert_max_queries(5):
+        response = client.get(f"/movies/{movie_id}")
+    assert response.status_code == 200
+
+
+def test_booking_page(client, showtime):
+    from seat_map import seat_map_cache
+    movie_id, showtime_id = showtime
+    seat_map_cache.invalidate(movie_id, showtime_id)
+
+    # Movie, GetShowtimeInfo, seat map (version, GetShowtimeSeats, hall,
+    # holds, version), shared products cache version and products
+    with assert_max_queries(9):
+        response = client.get(f"/movies/{movie_id}/{showtime_id}")
+    assert response.status_code == 200
+
+    # Seat map and products cached: at most one version check each
+    with assert_max_queries(4):
+        assert client.get(f"/movies/{movie_id}/{showtime_id}").status_code == 200
@@ -0,0 +1,42 @@
+import base64
+
+import pytest
+
+pytest.importorskip("sqlmodel")
+
+from seat_map import STATUS_CODES, encode_bitmap
+
+
+def seat(number, status, seat_type="Standard"):
+    return {"Seat_number": number, "Seat_type": seat_type, "Status": status}
+
+
+def test_statuses_and_types():
+    seats = [seat("A1", "AVAILABLE"), seat("A2", "BOOKED"), seat("B3", "HELD", "VIP")]
+    bitmap = encode_bitmap(seats, rows=2, cols=3)
+
+    # One nibble per position, row-major, high nibble first; 0 = no seat
+    assert base64.b64decode(bitmap["statuses"]) == bytes([0x12, 0x00, 0x04])
+    assert bitmap["status_codes"] == STATUS_CODES
+    assert bitmap["seat_types"] == ["Standard", "VIP"]
+    assert bitmap["type_runs"] == [[0, 2], [-1, 3], [1, 1]]
+    assert (bitmap["rows"], bitmap["cols"], bitmap["extra"]) == (2, 3, [])
+
+
+def test_odd_grid_is_padded():
+    bitmap = encode_bitmap([seat("A3", "BLOCKED")], rows=1, cols=3)
+    assert base64.b64decode(bitmap["statuses"]) == bytes([0x00, 0x30])
+    assert bitmap["type_runs"] == [[-1, 2], [0, 1]]
+
+
+def test_seats_outside_the_grid_go_to_extra():
+    outside = [seat("C1", "AVAILABLE"), seat("A9", "AVAILABLE"), seat("VIP-1", "BOOKED"), seat("A1", "UNKNOWN")]
+    bitmap = encode_bitmap(outside, rows=2, cols=3)
+    assert bitmap["extra"] == outside
+    assert base64.b64decode(bitmap["statuses"]) == bytes(3)
+
+
+def test_empty_hall():
+    bitmap = encode_bitmap([], rows=0, cols=0)
+    assert (bitmap["statuses"], bitmap["type_runs"]) == ("", [])
+
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from model import SpoilerResultCache
+
+RESULT = {"label": "LABEL_0", "score": 0.99}
+
+
+def test_key_ignores_whitespace_and_case():
+    assert SpoilerResultCache.key("  Great   movie\n") == SpoilerResultCache.key("great movie")
+    assert SpoilerResultCache.key("GREAT\tMovie") == SpoilerResultCache.key("great movie")
+    assert SpoilerResultCache.key("great movie") != SpoilerResultCache.key("great movies")
+    assert SpoilerResultCache.key(None) == SpoilerResultCache.key("")
+
+
+def test_hit_for_normalised_text():
+    cache = SpoilerResultCache(maxsize=10, path=None)
+    assert cache.get("Great movie") is None
+    cache.put("Great movie", RESULT, ms=12.0)
+    assert cache.get("  great   MOVIE ") == RESULT
+    assert (cache.hits, cache.misses, cache.saved_ms) == (1, 1, 12.0)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SpoilerResultCache(maxsize=2, path=None)
+    cache.put("a", RESULT, ms=1)
+    cache.put("b", RESULT, ms=1)
+    cache.get("a")                     # b is now the oldest
+    cache.put("c", RESULT, ms=1)
+    assert cache.get("b") is None
+    assert cache.get("a") == RESULT
+    assert cache.get("c") == RESULT
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "spoiler_cache.json")
+    cache = SpoilerResultCache(maxsize=10, path=path)
+    cache.put("a", RESULT, ms=1)
+    cache.put("b", RESULT, ms=1)
+    cache.save()
+    assert os.listdir(tmp_path) == ["spoiler_cache.json"]      # no temp file left behind
+
+    # A smaller cache keeps the most recent entries
+    loaded = SpoilerResultCache(maxsize=1, path=path)
+    loaded.load()
+    assert loaded.get("a") is None
+    assert loaded.get("b") == RESULT
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sql_logging import fingerprint, normalize_statement
+
+
+def test_literals_and_whitespace_share_a_fingerprint():
+    a = "SELECT Title FROM Movie WHERE Movie_id = 12 AND Language = 'English'"
+    b = "SELECT Title\n  FROM Movie\n WHERE Movie_id = 7   AND Language = 'Tiếng Việt'"
+    assert normalize_statement(a) == "SELECT Title FROM Movie WHERE Movie_id = ? AND Language = ?"
+    assert fingerprint(a) == fingerprint(b)
+
+
+def test_quoted_quotes_and_decimals_are_literals():
+    assert normalize_statement("UPDATE Product SET Price = 12.50, Name = 'It''s' WHERE Product_id = 3") == \
+        "UPDATE Product SET Price = ?, Name = ? WHERE Product_id = ?"
+
+
+def test_digits_inside_identifiers_are_kept():
+    assert normalize_statement("SELECT col1 FROM t2 WHERE x = 1") == "SELECT col1 FROM t2 WHERE x = ?"
+
+
+def test_different_statements_differ():
+    assert fingerprint("SELECT * FROM Movie WHERE Movie_id = 1") != fingerprint("SELECT * FROM Event WHERE Event_id = 1")
+    assert len(fingerprint("SELECT 1")) == 16
@@ -0,0 +1,113 @@
+"""
+Local stub of the ZaloPay sandbox, for tests and load benchmarks.
+
+    python zalopay_stub.py [--port 8090] [--latency-ms 50] [--error-rate 0.1] [--result paid]
+    ZALOPAY_BASE_URL=http://127.0.0.1:8090 uvicorn main:app
+
+Serves the two endpoints routes/zalopay.py calls, checking the mac with KEY1:
+    POST /v001/tpe/createorder            -> {"returncode": 1, "orderurl": ..., "zptranstoken": ...}
+    POST /v001/tpe/getstatusbyapptransid  -> returncode 1 (paid) / 2 (failed) / 3 (pending)
+--latency-ms delays every response, --error-rate answers that share of requests
+with a 503, to exercise the client's timeouts and retries.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+KEY1 = os.getenv("KEY1", "")
+RETURN_CODES = {"paid": 1, "failed": 2, "pending": 3}
+
+
+def sign(*fields) -> str:
+    return hmac.new(KEY1.encode(), "|".join(str(f) for f in fields).encode(), hashlib.sha256).hexdigest()
+
+
+class ZaloPayStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep-alive, like the real API
+    orders = {}
+    lock = threading.Lock()
+    options = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = {k: v[0] for k, v in urllib.parse.parse_qs(self.rfile.read(length).decode()).items()}
+
+        if self.options.latency_ms:
+            time.sleep(self.options.latency_ms / 1000)
+        if random.random() < self.options.error_rate:
+            return self.reply(503, {"error": "stub: injected failure"})
+
+        if self.path == "/v001/tpe/createorder":
+            return self.reply(200, self.create_order(form))
+        if self.path == "/v001/tpe/getstatusbyapptransid":
+            return self.reply(200, self.query_order(form))
+        self.reply(404, {"error": f"unknown path {self.path}"})
+
+    def create_order(self, form):
+        mac = sign(form.get("appid"), form.get("apptransid"), form.get("appuser"), form.get("amount"),
+                   form.get("apptime"), form.get("embeddata"), form.get("item"))
+        if not hmac.compare_digest(mac, form.get("mac", "")):
+            return {"returncode": -2, "returnmessage": "mac not equal"}
+        token = hashlib.sha1(form["apptransid"].encode()).hexdigest()[:16]
+        with self.lock:
+            self.orders[form["apptransid"]] = int(form.get("amount", 0))
+        return {
+            "returncode": 1, "returnmessage": "",
+            "zptranstoken": token,
+            "orderurl": f"http://{self.headers.get('Host')}/pay?token={token}",
+        }
+
+    def query_order(self, form):
+        mac = sign(form.get("appid"), form.get("apptransid"), KEY1)
+        if not hmac.compare_digest(mac, form.get("mac", "")):
+            return {"returncode": -2, "returnmessage": "mac not equal"}
+        with self.lock:
+            amount = self.orders.get(form["apptransid"])
+        if amount is None:
+            return {"returncode": -49, "returnmessage": "apptransid not found"}
+        return {
+            "returncode": RETURN_CODES[self.options.result], "returnmessage": "",
+            "isprocessing": self.options.result == "pending",
+            "amount": amount, "zptransid": random.randint(10 ** 8, 10 ** 9),
+        }
+
+    def reply(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZaloPay sandbox stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--result", choices=sorted(RETURN_CODES), default="paid")
+    ZaloPayStubHandler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer((ZaloPayStubHandler.options.host, ZaloPayStubHandler.options.port), ZaloPayStubHandler)
+    server.daemon_threads = True
+    print(f"ZaloPay stub on http://{ZaloPayStubHandler.options.host}:{ZaloPayStubHandler.options.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -61,8 +61,12 @@ CREATE TABLE Review(
     Date_comment Date,
     Comment VARCHAR(250),
     spoiler_tag enum('spoiler', 'non_spoiler') NOT NULL DEFAULT 'non_spoiler',
+    Moderation_status enum('pending', 'published') NOT NULL DEFAULT 'published', -- pending: chờ model kiểm tra spoiler
+    Spoiler_label VARCHAR(50),           -- kết quả model (backfill_spoilers.py)
+    Spoiler_score DECIMAL(5,4),
     FOREIGN KEY(Movie_id) REFERENCES Movie(Movie_id),
-    FOREIGN KEY(Customer_id) REFERENCES Customer(Customer_id)
+    FOREIGN KEY(Customer_id) REFERENCES Customer(Customer_id),
+    INDEX idx_review_movie_customer (Movie_id, Customer_id)
 )ENGINE=InnoDB
 CHARACTER SET utf8mb4
 COLLATE utf8mb4_unicode_ci;
@@ -581,6 +585,29 @@ CREATE TABLE Ticket (
   DEFAULT CHARSET=utf8mb4
   COLLATE=utf8mb4_unicode_ci;
 
+-- SeatHold: temporary checkout holds (SEAT_HOLD_BACKEND=mysql), expired rows are overwritten / swept
+CREATE TABLE SeatHold (
+    Showtime_id INT,
+    Seat_number VARCHAR(10),
+    Holder_id INT NOT NULL,
+    Expires_at DATETIME NOT NULL,
+    PRIMARY KEY (Showtime_id, Seat_number),
+    INDEX idx_seathold_expires (Expires_at),
+    FOREIGN KEY (Showtime_id) REFERENCES Showtime(Showtime_id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+
+-- CacheVersion: bumped when a catalog cache (movies, events, products) is
+-- invalidated; every API worker compares it to drop its in-process copy
+CREATE TABLE CacheVersion (
+    Cache_name VARCHAR(32) PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+
 -- Receipt
 CREATE TABLE Receipt(
     Receipt_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -589,8 +616,11 @@ CREATE TABLE Receipt(
     Status ENUM('Pending', 'Paid', 'Failed') DEFAULT 'Pending',
     Customer_id INT NOT NULL,
     CV_id INT,
+    -- thời điểm tạo, dùng để hết hạn các đơn ZaloPay còn Pending
+    Created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (Customer_id) REFERENCES Customer(Customer_id),
-    FOREIGN KEY (Customer_id, CV_id) REFERENCES CustomerVoucher(Customer_id, CV_id)
+    FOREIGN KEY (Customer_id, CV_id) REFERENCES CustomerVoucher(Customer_id, CV_id),
+    INDEX idx_receipt_pending (Status, Method, Created_at)
 ) ENGINE=InnoDB
 CHARACTER SET utf8mb4
 COLLATE utf8mb4_unicode_ci;
@@ -480,7 +480,7 @@ BEGIN
     -- 2. Tính điểm đánh giá trung bình
     SELECT AVG(Rating) INTO v_average_rating
     FROM Review
-    WHERE Movie_id = p_movie_id;
+    WHERE Movie_id = p_movie_id AND Moderation_status = 'published';
 
     -- 3. Xử lý trường hợp phim chưa có đánh giá
     -- Nếu không có đánh giá, AVG sẽ trả về NULL.
@@ -52,7 +52,9 @@ BEGIN
     FROM Review r
     JOIN Customer c 
         ON c.Customer_id = r.Customer_id
-    WHERE r.Movie_id = p_movie_id AND (p_spoiler_tag IS NULL OR r.spoiler_tag = p_spoiler_tag)
+    WHERE r.Movie_id = p_movie_id
+      AND r.Moderation_status = 'published'
+      AND (p_spoiler_tag IS NULL OR r.spoiler_tag = p_spoiler_tag)
     ORDER BY r.Date_comment DESC;
 END$$
 
@@ -3562,6 +3562,243 @@ BEGIN
 END $$
 
 
+-- Release every seat of a receipt with a constant number of statements:
+-- ShowtimeSeatCounter is adjusted once per (showtime, slot) in key order
+-- (trg_seatcounter_update skips rows while @bulk_seat_release is set), then
+-- all seats with one joined UPDATE.
+DROP PROCEDURE IF EXISTS release_receipt_seats $$
+CREATE PROCEDURE release_receipt_seats
+(
+    IN p_receipt_id INT
+)
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        SET @bulk_seat_release = NULL;
+        RESIGNAL;
+    END;
+
+    -- same lock order as create_receipt_bulk (a joined UPDATE has no guaranteed row order)
+    INSERT INTO ShowtimeSeatCounter (Showtime_id, Slot, Booked_seats, Seat_version)
+    SELECT ss.Showtime_id, seat_counter_slot(ss.Seat_number) AS Slot, -COUNT(*), 1
+    FROM Ticket t
+    JOIN ShowtimeSeat ss
+      ON ss.Movie_id = t.Movie_id
+     AND ss.Showtime_id = t.Showtime_id
+     AND ss.Branch_id = t.Branch_id
+     AND ss.Hall_number = t.Hall_number
+     AND ss.Seat_number = t.Seat_number
+    WHERE t.Receipt_id = p_receipt_id
+      AND ss.Status = 'BOOKED'
+    GROUP BY ss.Showtime_id, Slot
+    ORDER BY ss.Showtime_id, Slot
+    ON DUPLICATE KEY UPDATE
+        Booked_seats = Booked_seats + VALUES(Booked_seats),
+        Seat_version = Seat_version + 1;
+
+    SET @bulk_seat_release = 1;
+
+    UPDATE ShowtimeSeat ss
+    JOIN Ticket t
+      ON ss.Movie_id = t.Movie_id
+     AND ss.Showtime_id = t.Showtime_id
+     AND ss.Branch_id = t.Branch_id
+     AND ss.Hall_number = t.Hall_number
+     AND ss.Seat_number = t.Seat_number
+    SET ss.Status = 'AVAILABLE'
+    WHERE t.Receipt_id = p_receipt_id
+      AND ss.Status = 'BOOKED';
+
+    SET @bulk_seat_release = NULL;
+END $$
+
+
+-- Bulk receipt: the whole cart in one call.
+-- p_tickets:  [{"price", "movie_id", "showtime_id", "branch_id", "hall_number", "seat_number"}, ...]
+-- p_products: [{"product_id", "quantity"}, ...]
+-- Seats are booked with one UPDATE (all or nothing), tickets and products are
+-- inserted with one INSERT ... SELECT each, and loyalty points are added once
+-- (the per-row loyalty triggers skip rows while @bulk_receipt is set).
+DROP PROCEDURE IF EXISTS create_receipt_bulk $$
+CREATE PROCEDURE create_receipt_bulk
+(
+    IN p_receipt_date VARCHAR(20),
+    IN p_method VARCHAR(250),
+    IN p_status VARCHAR(20),
+    IN p_customer_id INT,
+    IN p_cv_id INT,
+    IN p_tickets JSON,
+    IN p_products JSON
+)
+BEGIN
+    DECLARE rec_date DATE;
+    DECLARE receipt_id INT;
+    DECLARE ticket_count INT;
+    DECLARE product_count INT;
+    DECLARE product_points INT;
+
+    -- never leave the flags set on a pooled connection
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        SET @bulk_receipt = NULL;
+        SET @bulk_seat_book = NULL;
+        RESIGNAL;
+    END;
+
+    IF NOT EXISTS (SELECT 1 FROM Customer WHERE Customer_id = p_customer_id) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Customer ID does not exist.';
+    END IF;
+
+    SET rec_date = STR_TO_DATE(p_receipt_date, '%d/%m/%Y');
+    IF rec_date IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Receipt date format must be dd/mm/yyyy.';
+    END IF;
+
+    IF p_method IS NULL OR p_method = '' THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Payment method cannot be NULL.';
+    END IF;
+
+    IF p_status IS NULL OR p_status = '' THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Payment status cannot be NULL.';
+    END IF;
+
+    IF p_cv_id IS NOT NULL THEN
+        IF NOT EXISTS (SELECT 1 FROM `CustomerVoucher` WHERE Customer_id = p_customer_id AND CV_id = p_cv_id) THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Customer Voucher ID (CV_id) does not exist for this Customer.';
+        ELSEIF (SELECT `Status` FROM `CustomerVoucher`
+        WHERE Customer_id = p_customer_id AND CV_id = p_cv_id) != 'Unused' THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Voucher is not available (Status is not "Unused").';
+        END IF;
+    END IF;
+
+    SET ticket_count = COALESCE(JSON_LENGTH(p_tickets), 0);
+    SET product_count = COALESCE(JSON_LENGTH(p_products), 0);
+    IF ticket_count = 0 AND product_count = 0 THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Receipt must contain at least one ticket or product.';
+    END IF;
+
+    -- tickets --
+    IF EXISTS (
+        SELECT 1 FROM JSON_TABLE(p_tickets, '$[*]' COLUMNS (Price DECIMAL(10,2) PATH '$.price')) jt
+        WHERE jt.Price IS NULL OR jt.Price < 0
+    ) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: the ticket price has to be >= 0.';
+    END IF;
+
+    IF ticket_count > 0 THEN
+        -- trg_seatcounter_update skips these rows: the counters are bumped below in key order
+        SET @bulk_seat_book = 1;
+
+        UPDATE ShowtimeSeat ss
+        JOIN JSON_TABLE(p_tickets, '$[*]' COLUMNS (
+                Movie_id INT PATH '$.movie_id',
+                Showtime_id INT PATH '$.showtime_id',
+                Branch_id INT PATH '$.branch_id',
+                Hall_number INT PATH '$.hall_number',
+                Seat_number VARCHAR(10) PATH '$.seat_number'
+            )) jt
+          ON ss.Movie_id = jt.Movie_id
+         AND ss.Showtime_id = jt.Showtime_id
+         AND ss.Branch_id = jt.Branch_id
+         AND ss.Hall_number = jt.Hall_number
+         AND ss.Seat_number = jt.Seat_number
+        SET ss.Status = 'BOOKED'
+        WHERE ss.Status = 'AVAILABLE';
+
+        -- duplicates in the cart or seats already taken book fewer rows than requested
+        IF ROW_COUNT() <> ticket_count THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Provided ShowtimeSeat does not available.';
+        END IF;
+
+        SET @bulk_seat_book = NULL;
+
+        -- one upsert per (showtime, slot), in key order, so two carts never
+        -- lock the same counter rows in opposite orders
+        INSERT INTO ShowtimeSeatCounter (Showtime_id, Slot, Booked_seats, Seat_version)
+        SELECT jt.Showtime_id, seat_counter_slot(jt.Seat_number) AS Slot, COUNT(*), 1
+        FROM JSON_TABLE(p_tickets, '$[*]' COLUMNS (
+                Showtime_id INT PATH '$.showtime_id',
+                Seat_number VARCHAR(10) PATH '$.seat_number'
+            )) jt
+        GROUP BY jt.Showtime_id, Slot
+        ORDER BY jt.Showtime_id, Slot
+        ON DUPLICATE KEY UPDATE
+            Booked_seats = Booked_seats + VALUES(Booked_seats),
+            Seat_version = Seat_version + 1;
+    END IF;
+
+    -- products --
+    IF product_count > 0 THEN
+        IF EXISTS (
+            SELECT 1
+            FROM JSON_TABLE(p_products, '$[*]' COLUMNS (
+                    Product_id INT PATH '$.product_id',
+                    Quantity INT PATH '$.quantity'
+                )) jp
+            LEFT JOIN Product p ON p.Product_id = jp.Product_id
+            WHERE p.Product_id IS NULL
+        ) THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Product does not exist.';
+        END IF;
+
+        IF EXISTS (
+            SELECT 1 FROM JSON_TABLE(p_products, '$[*]' COLUMNS (Quantity INT PATH '$.quantity')) jp
+            WHERE jp.Quantity IS NULL OR jp.Quantity <= 0
+        ) THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Quantity must be a positive number (>= 1).';
+        END IF;
+
+        IF (SELECT COUNT(DISTINCT jp.Product_id)
+            FROM JSON_TABLE(p_products, '$[*]' COLUMNS (Product_id INT PATH '$.product_id')) jp) <> product_count THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ERROR: Product already exists in this order.';
+        END IF;
+    END IF;
+
+    INSERT INTO Receipt(Receipt_date, Method, Status, Customer_id, CV_id)
+    VALUES (rec_date, p_method, p_status, p_customer_id, p_cv_id);
+
+    SET receipt_id = LAST_INSERT_ID();
+
+    SET @bulk_receipt = 1;
+
+    INSERT INTO Ticket (Price, Receipt_id, Movie_id, Showtime_id, Branch_id, Hall_number, Seat_number)
+    SELECT jt.Price, receipt_id, jt.Movie_id, jt.Showtime_id, jt.Branch_id, jt.Hall_number, jt.Seat_number
+    FROM JSON_TABLE(p_tickets, '$[*]' COLUMNS (
+            Price DECIMAL(10,2) PATH '$.price',
+            Movie_id INT PATH '$.movie_id',
+            Showtime_id INT PATH '$.showtime_id',
+            Branch_id INT PATH '$.branch_id',
+            Hall_number INT PATH '$.hall_number',
+            Seat_number VARCHAR(10) PATH '$.seat_number'
+        )) jt;
+
+    INSERT INTO OrderProduct (Receipt_id, Product_id, Quantity)
+    SELECT receipt_id, jp.Product_id, jp.Quantity
+    FROM JSON_TABLE(p_products, '$[*]' COLUMNS (
+            Product_id INT PATH '$.product_id',
+            Quantity INT PATH '$.quantity'
+        )) jp;
+
+    SET @bulk_receipt = NULL;
+
+    -- same points as trg_loyalty_add_ticket / trg_loyalty_add_product, in one UPDATE
+    SELECT COALESCE(SUM(jp.Quantity), 0) INTO product_points
+    FROM JSON_TABLE(p_products, '$[*]' COLUMNS (Quantity INT PATH '$.quantity')) jp;
+
+    UPDATE Customer
+    SET Loyal_point = Loyal_point + ticket_count * 5 + product_points
+    WHERE Customer_id = p_customer_id;
+
+    IF p_cv_id IS NOT NULL THEN
+        UPDATE CustomerVoucher
+        SET Status = 'Used'
+        WHERE Customer_id = p_customer_id AND CV_id = p_cv_id;
+    END IF;
+
+    SELECT receipt_id;
+END $$
+
+
 DROP PROCEDURE IF EXISTS update_receipt $$
 CREATE PROCEDURE update_receipt
 (
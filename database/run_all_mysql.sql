@@ -67,6 +67,12 @@ SOURCE trigger/db_triggers.sql;
 SELECT '>> Executing: trigger/create_data_trigger.sql' AS Status;
 SOURCE trigger/create_data_trigger.sql;
 
+SELECT '>> Executing: trigger/movie_stats.sql' AS Status;
+SOURCE trigger/movie_stats.sql;
+
+SELECT '>> Executing: trigger/showtime_seat_counter.sql' AS Status;
+SOURCE trigger/showtime_seat_counter.sql;
+
 -- =============================================================================
 -- 5. ADD MOCK DATA
 -- =============================================================================
@@ -204,33 +204,8 @@ BEGIN
 END //
 DELIMITER ;
 
-DELIMITER //
-CREATE TRIGGER trg_seat_book
-AFTER UPDATE ON ShowtimeSeat
-FOR EACH ROW
-BEGIN
-    IF OLD.Status = 'Available' AND NEW.Status = 'Booked' THEN
-        UPDATE Hall
-        SET Seat_capacity = Seat_capacity - 1
-        WHERE Branch_id = NEW.Branch_id
-          AND Hall_number = NEW.Hall_number;
-    END IF;
-END//
-DELIMITER ;
-
-DELIMITER //
-CREATE TRIGGER trg_seat_unbook
-AFTER UPDATE ON ShowtimeSeat
-FOR EACH ROW
-BEGIN
-    IF OLD.Status = 'Booked' AND NEW.Status = 'Available' THEN
-        UPDATE Hall
-        SET Seat_capacity = Seat_capacity + 1
-        WHERE Branch_id = NEW.Branch_id
-          AND Hall_number = NEW.Hall_number;
-    END IF;
-END//
-DELIMITER ;
+-- Seat booking counts are kept per showtime in ShowtimeSeatCounter
+-- (trigger/showtime_seat_counter.sql), not on the Hall row.
 
 DELIMITER //
 
@@ -238,14 +213,17 @@ CREATE TRIGGER trg_loyalty_add_ticket
 AFTER INSERT ON Ticket
 FOR EACH ROW
 BEGIN
-    UPDATE Customer
-    SET Loyal_point = Loyal_point + 5
-    WHERE Customer_id = (
-        SELECT Customer_id
-        FROM Receipt
-        WHERE Receipt_id = NEW.Receipt_id
-        LIMIT 1
-    );
+    -- create_receipt_bulk adds the points of the whole cart itself
+    IF @bulk_receipt IS NULL THEN
+        UPDATE Customer
+        SET Loyal_point = Loyal_point + 5
+        WHERE Customer_id = (
+            SELECT Customer_id
+            FROM Receipt
+            WHERE Receipt_id = NEW.Receipt_id
+            LIMIT 1
+        );
+    END IF;
 END;
 //
 
@@ -257,14 +235,17 @@ CREATE TRIGGER trg_loyalty_add_product
 AFTER INSERT ON OrderProduct
 FOR EACH ROW
 BEGIN
-    UPDATE Customer
-    SET Loyal_point = Loyal_point + (NEW.Quantity * 1)
-    WHERE Customer_id = (
-        SELECT Customer_id
-        FROM Receipt
-        WHERE Receipt_id = NEW.Receipt_id
-        LIMIT 1
-    );
+    -- create_receipt_bulk adds the points of the whole cart itself
+    IF @bulk_receipt IS NULL THEN
+        UPDATE Customer
+        SET Loyal_point = Loyal_point + (NEW.Quantity * 1)
+        WHERE Customer_id = (
+            SELECT Customer_id
+            FROM Receipt
+            WHERE Receipt_id = NEW.Receipt_id
+            LIMIT 1
+        );
+    END IF;
 END;
 //
 
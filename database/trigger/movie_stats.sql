@@ -0,0 +1,191 @@
+USE db_assignment2;
+
+-- =============================================================================
+-- MovieStats: per-movie rating sum/count and per-mood vote counts,
+-- kept current by triggers on Review and Vote so the catalog can read
+-- ratings and top moods without aggregating the base tables.
+-- Only published reviews count: a review waiting for spoiler moderation
+-- (Moderation_status = 'pending') is added when the worker publishes it.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS MovieStats (
+    Movie_id INT PRIMARY KEY,
+    Rating_sum DECIMAL(12,1) NOT NULL DEFAULT 0,
+    Rating_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (Movie_id) REFERENCES Movie(Movie_id) ON DELETE CASCADE
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS MovieMoodStats (
+    Movie_id INT,
+    Mood_id INT,
+    Vote_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Movie_id, Mood_id),
+    FOREIGN KEY (Movie_id) REFERENCES Movie(Movie_id) ON DELETE CASCADE,
+    FOREIGN KEY (Mood_id) REFERENCES Mood(Mood_id) ON DELETE CASCADE
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+
+
+-- trigger cập nhật rating khi có review mới
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_moviestats_review_insert //
+CREATE TRIGGER trg_moviestats_review_insert
+AFTER INSERT ON Review
+FOR EACH ROW
+BEGIN
+    IF NEW.Rating IS NOT NULL AND NEW.Moderation_status = 'published' THEN
+        INSERT INTO MovieStats (Movie_id, Rating_sum, Rating_count)
+        VALUES (NEW.Movie_id, NEW.Rating, 1)
+        ON DUPLICATE KEY UPDATE
+            Rating_sum = Rating_sum + NEW.Rating,
+            Rating_count = Rating_count + 1;
+    END IF;
+END //
+DELIMITER ;
+
+-- trigger cập nhật rating khi review bị sửa (có thể đổi cả Movie_id)
+-- hoặc được duyệt (pending -> published)
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_moviestats_review_update //
+CREATE TRIGGER trg_moviestats_review_update
+AFTER UPDATE ON Review
+FOR EACH ROW
+BEGIN
+    IF OLD.Rating IS NOT NULL AND OLD.Moderation_status = 'published' THEN
+        UPDATE MovieStats
+        SET Rating_sum = Rating_sum - OLD.Rating,
+            Rating_count = Rating_count - 1
+        WHERE Movie_id = OLD.Movie_id;
+    END IF;
+
+    IF NEW.Rating IS NOT NULL AND NEW.Moderation_status = 'published' THEN
+        INSERT INTO MovieStats (Movie_id, Rating_sum, Rating_count)
+        VALUES (NEW.Movie_id, NEW.Rating, 1)
+        ON DUPLICATE KEY UPDATE
+            Rating_sum = Rating_sum + NEW.Rating,
+            Rating_count = Rating_count + 1;
+    END IF;
+END //
+DELIMITER ;
+
+-- trigger cập nhật rating khi review bị xoá
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_moviestats_review_delete //
+CREATE TRIGGER trg_moviestats_review_delete
+AFTER DELETE ON Review
+FOR EACH ROW
+BEGIN
+    IF OLD.Rating IS NOT NULL AND OLD.Moderation_status = 'published' THEN
+        UPDATE MovieStats
+        SET Rating_sum = Rating_sum - OLD.Rating,
+            Rating_count = Rating_count - 1
+        WHERE Movie_id = OLD.Movie_id;
+    END IF;
+END //
+DELIMITER ;
+
+-- trigger đếm vote mood
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_moviestats_vote_insert //
+CREATE TRIGGER trg_moviestats_vote_insert
+AFTER INSERT ON Vote
+FOR EACH ROW
+BEGIN
+    INSERT INTO MovieMoodStats (Movie_id, Mood_id, Vote_count)
+    VALUES (NEW.Movie_id, NEW.Mood_id, 1)
+    ON DUPLICATE KEY UPDATE Vote_count = Vote_count + 1;
+END //
+DELIMITER ;
+
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_moviestats_vote_delete //
+CREATE TRIGGER trg_moviestats_vote_delete
+AFTER DELETE ON Vote
+FOR EACH ROW
+BEGIN
+    UPDATE MovieMoodStats
+    SET Vote_count = Vote_count - 1
+    WHERE Movie_id = OLD.Movie_id
+      AND Mood_id = OLD.Mood_id;
+END //
+DELIMITER ;
+
+
+-- ============================================
+-- rebuild_movie_stats: tính lại toàn bộ từ Review và Vote
+-- ============================================
+DELIMITER $$
+DROP PROCEDURE IF EXISTS rebuild_movie_stats $$
+CREATE PROCEDURE rebuild_movie_stats()
+BEGIN
+    DELETE FROM MovieStats;
+    DELETE FROM MovieMoodStats;
+
+    INSERT INTO MovieStats (Movie_id, Rating_sum, Rating_count)
+    SELECT Movie_id, SUM(Rating), COUNT(Rating)
+    FROM Review
+    WHERE Movie_id IS NOT NULL AND Moderation_status = 'published'
+    GROUP BY Movie_id;
+
+    INSERT INTO MovieMoodStats (Movie_id, Mood_id, Vote_count)
+    SELECT Movie_id, Mood_id, COUNT(*)
+    FROM Vote
+    GROUP BY Movie_id, Mood_id;
+END $$
+DELIMITER ;
+
+-- ============================================
+-- verify_movie_stats: liệt kê các dòng lệch so với bảng gốc
+-- (không có dòng nào trả về nghĩa là MovieStats đúng)
+-- ============================================
+DELIMITER $$
+DROP PROCEDURE IF EXISTS verify_movie_stats $$
+CREATE PROCEDURE verify_movie_stats()
+BEGIN
+    SELECT
+        'rating' AS Kind,
+        m.Movie_id,
+        NULL AS Mood_id,
+        COALESCE(s.Rating_count, 0) AS Stored_count,
+        COALESCE(r.Rating_count, 0) AS Actual_count,
+        COALESCE(s.Rating_sum, 0) AS Stored_sum,
+        COALESCE(r.Rating_sum, 0) AS Actual_sum
+    FROM Movie m
+    LEFT JOIN MovieStats s ON s.Movie_id = m.Movie_id
+    LEFT JOIN (
+        SELECT Movie_id, SUM(Rating) AS Rating_sum, COUNT(Rating) AS Rating_count
+        FROM Review
+        WHERE Moderation_status = 'published'
+        GROUP BY Movie_id
+    ) r ON r.Movie_id = m.Movie_id
+    WHERE COALESCE(s.Rating_count, 0) <> COALESCE(r.Rating_count, 0)
+       OR COALESCE(s.Rating_sum, 0) <> COALESCE(r.Rating_sum, 0)
+
+    UNION ALL
+
+    SELECT
+        'mood' AS Kind,
+        mm.Movie_id,
+        mm.Mood_id,
+        COALESCE(s.Vote_count, 0) AS Stored_count,
+        COALESCE(v.Vote_count, 0) AS Actual_count,
+        NULL AS Stored_sum,
+        NULL AS Actual_sum
+    FROM (
+        SELECT m.Movie_id, md.Mood_id FROM Movie m CROSS JOIN Mood md
+    ) mm
+    LEFT JOIN MovieMoodStats s ON s.Movie_id = mm.Movie_id AND s.Mood_id = mm.Mood_id
+    LEFT JOIN (
+        SELECT Movie_id, Mood_id, COUNT(*) AS Vote_count
+        FROM Vote
+        GROUP BY Movie_id, Mood_id
+    ) v ON v.Movie_id = mm.Movie_id AND v.Mood_id = mm.Mood_id
+    WHERE COALESCE(s.Vote_count, 0) <> COALESCE(v.Vote_count, 0);
+END $$
+DELIMITER ;
+
+-- Khởi tạo dữ liệu cho các review / vote đã có sẵn
+CALL rebuild_movie_stats();
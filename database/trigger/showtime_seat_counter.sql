@@ -0,0 +1,134 @@
+USE db_assignment2;
+
+-- =============================================================================
+-- ShowtimeSeatCounter: seat capacity / booked counts per showtime, replacing
+-- the old trg_seat_book / trg_seat_unbook that updated Hall.Seat_capacity on
+-- every booking (one hot row per hall, shared by all its showtimes, which also
+-- fired trg_branch_hall_update on Cinema_Branch).
+--
+-- Each showtime has seat_counter_slots() rows; a seat always counts in slot
+-- CRC32(Seat_number) % slots, so concurrent bookings of one showtime spread
+-- over several rows. Read with SUM(...) GROUP BY Showtime_id (see the
+-- ShowtimeAvailability view). Hall.Seat_capacity stays the physical capacity.
+--
+-- SUM(Seat_version) of a showtime grows with every change of its seats and is
+-- the seat-map version shared by all API workers (seat_map.py).
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS ShowtimeSeatCounter (
+    Showtime_id INT,
+    Slot TINYINT,
+    Total_seats INT NOT NULL DEFAULT 0,
+    Booked_seats INT NOT NULL DEFAULT 0,
+    -- bumped by every seat change; SUM per showtime is the shared seat-map version
+    Seat_version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Showtime_id, Slot),
+    FOREIGN KEY (Showtime_id) REFERENCES Showtime(Showtime_id) ON DELETE CASCADE
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+
+-- Số slot mỗi suất chiếu; đổi số này thì CALL rebuild_showtime_seat_counters()
+DELIMITER $$
+DROP FUNCTION IF EXISTS seat_counter_slots $$
+CREATE FUNCTION seat_counter_slots() RETURNS TINYINT
+DETERMINISTIC
+BEGIN
+    RETURN 4;
+END $$
+
+DROP FUNCTION IF EXISTS seat_counter_slot $$
+CREATE FUNCTION seat_counter_slot(p_seat_number VARCHAR(10)) RETURNS TINYINT
+DETERMINISTIC
+BEGIN
+    RETURN CRC32(p_seat_number) % seat_counter_slots();
+END $$
+DELIMITER ;
+
+CREATE OR REPLACE VIEW ShowtimeAvailability AS
+SELECT
+    Showtime_id,
+    SUM(Total_seats) AS Total_seats,
+    SUM(Booked_seats) AS Booked_seats,
+    SUM(Total_seats) - SUM(Booked_seats) AS Available_seats
+FROM ShowtimeSeatCounter
+GROUP BY Showtime_id;
+
+
+-- trigger đếm ghế khi đổi trạng thái (đặt / huỷ đặt / khoá)
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_seat_book //
+DROP TRIGGER IF EXISTS trg_seat_unbook //
+DROP TRIGGER IF EXISTS trg_seatcounter_update //
+CREATE TRIGGER trg_seatcounter_update
+AFTER UPDATE ON ShowtimeSeat
+FOR EACH ROW
+BEGIN
+    -- create_receipt_bulk / release_receipt_seats update the counters of their
+    -- seats once per (showtime, slot) themselves, in key order
+    IF OLD.Status <> NEW.Status AND @bulk_seat_book IS NULL AND @bulk_seat_release IS NULL THEN
+        INSERT INTO ShowtimeSeatCounter (Showtime_id, Slot, Booked_seats, Seat_version)
+        VALUES (NEW.Showtime_id, seat_counter_slot(NEW.Seat_number),
+                (NEW.Status = 'BOOKED') - (OLD.Status = 'BOOKED'), 1)
+        ON DUPLICATE KEY UPDATE
+            Booked_seats = Booked_seats + VALUES(Booked_seats),
+            Seat_version = Seat_version + 1;
+    END IF;
+END //
+DELIMITER ;
+
+-- trigger đếm ghế khi sinh / xoá ghế của suất chiếu
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_seatcounter_insert //
+CREATE TRIGGER trg_seatcounter_insert
+AFTER INSERT ON ShowtimeSeat
+FOR EACH ROW
+BEGIN
+    INSERT INTO ShowtimeSeatCounter (Showtime_id, Slot, Total_seats, Booked_seats, Seat_version)
+    VALUES (NEW.Showtime_id, seat_counter_slot(NEW.Seat_number), 1, NEW.Status = 'BOOKED', 1)
+    ON DUPLICATE KEY UPDATE
+        Total_seats = Total_seats + 1,
+        Booked_seats = Booked_seats + (NEW.Status = 'BOOKED'),
+        Seat_version = Seat_version + 1;
+END //
+DELIMITER ;
+
+DELIMITER //
+DROP TRIGGER IF EXISTS trg_seatcounter_delete //
+CREATE TRIGGER trg_seatcounter_delete
+AFTER DELETE ON ShowtimeSeat
+FOR EACH ROW
+BEGIN
+    UPDATE ShowtimeSeatCounter
+    SET Total_seats = Total_seats - 1,
+        Booked_seats = Booked_seats - (OLD.Status = 'BOOKED'),
+        Seat_version = Seat_version + 1
+    WHERE Showtime_id = OLD.Showtime_id
+      AND Slot = seat_counter_slot(OLD.Seat_number);
+END //
+DELIMITER ;
+
+
+-- ============================================
+-- rebuild_showtime_seat_counters: tính lại toàn bộ từ ShowtimeSeat
+-- Seat_version only ever grows (seat-map clients compare against it)
+-- ============================================
+DELIMITER $$
+DROP PROCEDURE IF EXISTS rebuild_showtime_seat_counters $$
+CREATE PROCEDURE rebuild_showtime_seat_counters()
+BEGIN
+    UPDATE ShowtimeSeatCounter
+    SET Total_seats = 0, Booked_seats = 0, Seat_version = Seat_version + 1;
+
+    INSERT INTO ShowtimeSeatCounter (Showtime_id, Slot, Total_seats, Booked_seats, Seat_version)
+    SELECT Showtime_id, seat_counter_slot(Seat_number) AS Slot, COUNT(*), SUM(Status = 'BOOKED'), 1
+    FROM ShowtimeSeat
+    GROUP BY Showtime_id, Slot
+    ON DUPLICATE KEY UPDATE
+        Total_seats = VALUES(Total_seats),
+        Booked_seats = VALUES(Booked_seats);
+END $$
+DELIMITER ;
+
+-- Khởi tạo cho các suất chiếu đã có sẵn
+CALL rebuild_showtime_seat_counters();